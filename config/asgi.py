@@ -2,6 +2,8 @@
 ASGI config for posture_monitor_django project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP requests are handled by Django; WebSocket connections
+(``/ws/session/<id>/``) go to the streaming analysis channel.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -13,4 +15,13 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from posture_app.streaming import websocket_application  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        await websocket_application(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -5,8 +5,9 @@ from .models import UserProfile, PostureSession, PostureAlert, DailyStats
 
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
-    list_display = ['user', 'occupation', 'created_at']
+    list_display = ['user', 'occupation', 'created_at', 'total_sessions', 'total_time']
     search_fields = ['user__username', 'user__email']
+    readonly_fields = ['total_sessions', 'total_time', 'total_score', 'total_alerts']
 
 @admin.register(PostureSession)
 class PostureSessionAdmin(admin.ModelAdmin):
@@ -21,7 +22,8 @@ class PostureSessionAdmin(admin.ModelAdmin):
         }),
         ('Statistiques', {
             'fields': ('total_bad_posture_time', 'bad_posture_percentage', 'alert_count', 
-                      'average_neck_angle', 'average_back_angle', 'average_shoulder_diff')
+                      'average_neck_angle', 'average_back_angle', 'average_shoulder_diff',
+                      'metrics_summary')
         }),
         ('Score', {
             'fields': ('posture_score',)
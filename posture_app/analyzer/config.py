@@ -4,9 +4,10 @@ class PostureConfig:
     """Configuration pour l'analyse de posture"""
     
     # Seuils d'angles (en degrés)
-    NECK_ANGLE_MIN = 150  # Angle tête-cou minimum acceptable
-    BACK_ANGLE_MIN = 160  # Angle dos minimum acceptable
-    SHOULDER_DIFF_MAX = 15  # Différence max entre épaules
+    NECK_ANGLE_MAX = 15   # Inclinaison max de la tête par rapport à la verticale
+    NECK_ANGLE_MIN = 150  # Angle tête-cou minimum acceptable (non utilisé : voir NECK_ANGLE_MAX)
+    BACK_ANGLE_MIN = 160  # Angle dos (épaule-hanche-genou) minimum acceptable
+    SHOULDER_DIFF_MAX = 15  # Différence max de hauteur entre épaules (×100)
     
     # Temps avant alerte (en secondes)
     BAD_POSTURE_ALERT_TIME = 10  # Alerte après 10 secondes de mauvaise posture
@@ -26,8 +27,99 @@ class PostureConfig:
     
     # Paramètres vidéo
     VIDEO_FPS = 30
-    VIDEO_RESOLUTION = (640, 480)
+    VIDEO_RESOLUTION = (640, 480)  # Résolution de travail max de l'analyse (largeur, hauteur)
+
+    # Région d'intérêt (recadrage autour de la personne)
+    ROI_MARGIN = 0.25             # Marge ajoutée autour des landmarks (fraction de la boîte)
+    ROI_MIN_VISIBILITY = 0.5      # Visibilité minimale d'un landmark pris en compte
+    ROI_MIN_LANDMARKS = 8         # Landmarks visibles nécessaires pour suivre la personne
+    ROI_MAX_AREA = 0.8            # Au-delà de cette surface, la frame entière est analysée
     
+    # Filtrage temporel des landmarks (One-Euro) et hystérésis des verdicts
+    TEMPORAL_FILTER_ENABLED = True
+    ONE_EURO_MIN_CUTOFF = 0.1        # Fréquence de coupure au repos (Hz)
+    ONE_EURO_BETA = 5.0              # Réactivité aux mouvements rapides
+    ONE_EURO_D_CUTOFF = 1.0          # Coupure du lissage de la vitesse (Hz)
+    TEMPORAL_FILTER_RESET_GAP = 5.0  # Au-delà (s) sans frame, le filtre repart de zéro
+    HYSTERESIS_NECK_ANGLE = 3.0      # Marges autour des seuils (°, ° et ×100)
+    HYSTERESIS_BACK_ANGLE = 3.0
+    HYSTERESIS_SHOULDER_DIFF = 2.0
+
     # Paramètres MediaPipe
     MEDIAPIPE_MIN_DETECTION_CONFIDENCE = 0.5
     MEDIAPIPE_MIN_TRACKING_CONFIDENCE = 0.5
+    MEDIAPIPE_MODEL_COMPLEXITY = 1  # 0 (lite), 1 (full) ou 2 (heavy)
+
+    # Qualité adaptée à la charge : paliers du plus fin au plus léger
+    # (model_complexity, résolution de travail, image annotée renvoyée)
+    QUALITY_LEVELS = (
+        (2, VIDEO_RESOLUTION, True),
+        (MEDIAPIPE_MODEL_COMPLEXITY, VIDEO_RESOLUTION, True),
+        (1, (480, 360), True),
+        (0, (480, 360), True),
+        (0, (320, 240), False),
+    )
+    QUALITY_DEFAULT_LEVEL = 1        # Palier au démarrage du processus
+    QUALITY_HEAVY_MODEL = False      # Autoriser un modèle plus lourd que MEDIAPIPE_MODEL_COMPLEXITY
+                                     # même s'il n'est pas installé (téléchargé à la première utilisation)
+    QUALITY_MAX_SWITCHES = 2         # Sessions rechargeant leur détecteur par seconde au changement de palier
+    QUALITY_ADAPTIVE = True          # False : palier fixe (QUALITY_DEFAULT_LEVEL)
+    QUALITY_TARGET_P95 = 0.25        # Latence p95 visée pour l'analyse d'une frame (s)
+    QUALITY_MAX_QUEUE_DEPTH = 8      # Frames en attente (pool async + workers d'inférence) au-delà desquelles on allège
+    QUALITY_WINDOW = 10.0            # Fenêtre de mesure de la latence (s)
+    QUALITY_MIN_SAMPLES = 20         # Mesures nécessaires avant de décider
+    QUALITY_CHECK_INTERVAL = 2.0     # Intervalle entre deux décisions (s)
+    QUALITY_RECOVERY_RATIO = 0.5     # Remonter d'un palier si p95 < cible × ratio...
+    QUALITY_RECOVERY_DELAY = 30.0    # ... depuis au moins ce délai (doublé à chaque échec) (s)
+
+    # Mode de réponse des frames : 'image' (squelette dessiné par le serveur)
+    # ou 'landmarks' (landmarks seuls, dessinés par le navigateur)
+    FRAME_OUTPUT_MODES = ('image', 'landmarks')
+    FRAME_OUTPUT_DEFAULT = 'image'
+
+    # Nombre max de frames par requête d'analyse par lot, et taille max du lot
+    # (50 frames 640x480 en base64 dépassent les 2,5 Mo par défaut de Django :
+    # DATA_UPLOAD_MAX_MEMORY_SIZE est aligné sur cette valeur dans settings.py)
+    FRAME_BATCH_MAX = 50
+    FRAME_BATCH_MAX_BYTES = 12 * 1024 * 1024
+
+    # Nombre max d'alertes par requête d'enregistrement groupé
+    ALERT_BATCH_MAX = 500
+
+    # Filtre avant inférence (vignette en niveaux de gris)
+    FRAME_GATE_ENABLED = True
+    FRAME_GATE_SIZE = (160, 120)        # Taille de la vignette (largeur, hauteur)
+    FRAME_GATE_DIFF_THRESHOLD = 3.0     # Différence moyenne sous laquelle le résultat est réutilisé
+    FRAME_GATE_MAX_REUSE = 10           # Réutilisations consécutives max avant nouvelle analyse
+    FRAME_GATE_MIN_BRIGHTNESS = 35      # Luminosité moyenne minimale (0-255)
+    FRAME_GATE_MIN_SHARPNESS = 10.0     # Variance du laplacien minimale (netteté)
+
+    # Pool de détecteurs (un détecteur MediaPipe par session)
+    POSE_POOL_SIZE = 16           # Nombre max de détecteurs en mémoire
+    POSE_POOL_IDLE_TIMEOUT = 300  # Éviction après 5 minutes d'inactivité (s)
+
+    # Moteur d'inférence hors processus (0 = inférence dans le processus Django)
+    INFERENCE_WORKERS = 0
+    INFERENCE_SLOTS_PER_WORKER = 2          # Frames en attente par worker
+    INFERENCE_MAX_FRAME_SIZE = (1920, 1080)  # Taille max d'une frame (mémoire partagée)
+    INFERENCE_TIMEOUT = 5.0                 # Attente max d'un résultat (s)
+
+    # Vues d'API async : analyses simultanées et file d'attente bornée
+    FRAME_EXECUTOR_WORKERS = 0      # Threads d'analyse (0 = nombre de cœurs)
+    FRAME_EXECUTOR_QUEUE_MAX = 32   # Frames en attente au-delà desquelles on répond 503
+    FRAME_RETRY_AFTER = 1           # En-tête Retry-After des réponses 503 (s)
+
+    # Admission des frames : âge max avant analyse et cadence par utilisateur/session
+    FRAME_DEADLINE = 1.0            # Frame abandonnée si capturée il y a plus longtemps (s, 0 = jamais)
+    FRAME_CLOCK_SKEW_MAX = 30.0     # Au-delà, l'horodatage client est ignoré (horloges désynchronisées) (s)
+    FRAME_RATE_LIMIT = 5.0          # Frames par seconde par utilisateur et session (0 = illimité)
+    FRAME_RATE_BURST = 10           # Frames acceptées d'affilée avant limitation
+
+    # Sessions en cours côté serveur (registre par processus)
+    LIVE_SESSION_MAX = 1000       # Nombre max de sessions suivies en mémoire
+    LIVE_SESSION_TTL = 1800       # Abandon après 30 minutes sans frame (s)
+
+    # Série temporelle des mesures par frame
+    TIMELINE_CHUNK_SIZE = 1000    # Mesures par bloc enregistré en base
+    TIMELINE_MAX_POINTS = 500     # Points renvoyés par défaut par /timeline/
+    TIMELINE_POINTS_LIMIT = 5000  # Maximum demandable via ?points=
@@ -0,0 +1,84 @@
+# posture_app/analyzer/frame_gate.py
+
+import cv2
+
+from .config import PostureConfig
+
+# Décisions du filtre
+GATE_ANALYZE = 'analyze'   # Frame à analyser
+GATE_REUSE = 'reuse'       # Scène inchangée : réutiliser le dernier résultat
+GATE_REJECT = 'reject'     # Frame inexploitable (trop sombre ou floue)
+
+REJECT_MESSAGES = {
+    'too_dark': 'Image trop sombre',
+    'too_blurry': 'Image trop floue',
+}
+
+
+class FrameGate:
+    """
+    Filtre peu coûteux placé avant l'inférence MediaPipe (un par session)
+
+    Travaille sur une version réduite en niveaux de gris de la frame :
+    rejette les frames trop sombres ou trop floues, et réutilise le dernier
+    résultat lorsque la différence avec la dernière frame analysée reste
+    sous le seuil (une personne assise bouge peu).
+    """
+
+    def __init__(self):
+        self.reference = None
+        self.last_result = None
+        self.reuse_count = 0
+
+    def check(self, frame):
+        """
+        Évalue une frame de travail RGB
+
+        Returns:
+            (décision, raison, vignette) ; la vignette est à passer à
+            `store` si la frame est analysée
+        """
+        small = cv2.resize(frame, PostureConfig.FRAME_GATE_SIZE, interpolation=cv2.INTER_AREA)
+        small = cv2.cvtColor(small, cv2.COLOR_RGB2GRAY)
+
+        if small.mean() < PostureConfig.FRAME_GATE_MIN_BRIGHTNESS:
+            return GATE_REJECT, 'too_dark', small
+        if cv2.Laplacian(small, cv2.CV_32F).var() < PostureConfig.FRAME_GATE_MIN_SHARPNESS:
+            return GATE_REJECT, 'too_blurry', small
+
+        if (
+            self.reference is not None
+            and self.last_result is not None
+            and self.reuse_count < PostureConfig.FRAME_GATE_MAX_REUSE
+        ):
+            difference = cv2.absdiff(small, self.reference).mean()
+            if difference < PostureConfig.FRAME_GATE_DIFF_THRESHOLD:
+                self.reuse_count += 1
+                return GATE_REUSE, None, small
+
+        return GATE_ANALYZE, None, small
+
+    def store(self, small, result):
+        """Mémorise la frame analysée et son résultat comme nouvelle référence"""
+        if not result.get('success'):
+            return
+        self.reference = small
+        self.last_result = result
+        self.reuse_count = 0
+
+    def reused_result(self):
+        """Copie du dernier résultat, marquée comme réutilisée"""
+        result = dict(self.last_result)
+        result['fresh'] = False
+        return result
+
+
+def rejected_result(reason):
+    """Résultat renvoyé pour une frame inexploitable"""
+    return {
+        'success': True,
+        'detected': False,
+        'fresh': False,
+        'rejected': reason,
+        'message': REJECT_MESSAGES[reason],
+    }
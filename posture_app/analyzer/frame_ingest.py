@@ -0,0 +1,165 @@
+# posture_app/analyzer/frame_ingest.py
+
+"""
+Préparation des frames reçues, du flux d'octets à la frame de travail.
+
+- Les JPEG sont décodés directement à échelle réduite (IMREAD_REDUCED_*,
+  mise à l'échelle DCT de libjpeg) lorsque la résolution de travail le
+  permet : une frame 1920x1080 n'est jamais décodée en entier pour une
+  analyse en 640x480.
+- Le décodage produit directement du RGB, l'ordre attendu par MediaPipe ;
+  seule l'image annotée repasse en BGR pour l'encodage JPEG.
+- La frame de travail et l'image annotée sont écrites dans des tampons
+  alloués une fois par session et réutilisés d'une frame à l'autre.
+"""
+
+import threading
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+
+from .config import PostureConfig
+
+# Décodage RGB natif (OpenCV >= 4.10), sinon BGR converti sur place
+_IMREAD_RGB = getattr(cv2, 'IMREAD_COLOR_RGB', None)
+
+# Facteurs de réduction au décodage, du plus fort au plus faible
+_REDUCED_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+# Marqueurs JPEG SOFn portant la taille de l'image (hors DHT, JPG et DAC)
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+class FrameBuffers:
+    """Tampons d'image d'une session, réalloués seulement quand la taille change"""
+
+    def __init__(self):
+        self._arrays = {}
+        self._lock = threading.Lock()
+
+    def get(self, name, shape):
+        array = self._arrays.get(name)
+        if array is None or array.shape != shape:
+            array = self._arrays[name] = np.empty(shape, dtype=np.uint8)
+        return array
+
+    @contextmanager
+    def lease(self):
+        """Réserve les tampons pendant le bloc ; tampons temporaires s'ils sont déjà utilisés"""
+        if not self._lock.acquire(blocking=False):
+            # Deux requêtes simultanées sur la même session : ne pas partager
+            yield FrameBuffers()
+            return
+        try:
+            yield self
+        finally:
+            self._lock.release()
+
+
+def _buffer(buffers, name, shape):
+    if buffers is None:
+        return np.empty(shape, dtype=np.uint8)
+    return buffers.get(name, shape)
+
+
+def jpeg_size(data):
+    """(largeur, hauteur) lues dans l'en-tête d'un JPEG ; None pour un autre format"""
+    data = memoryview(data)
+    if len(data) < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+
+    offset = 2
+    while offset + 9 <= len(data):
+        if data[offset] != 0xFF:
+            return None
+        marker = data[offset + 1]
+        if marker == 0xFF:  # Octet de remplissage
+            offset += 1
+            continue
+        if marker in _JPEG_SOF_MARKERS:
+            height = data[offset + 5] << 8 | data[offset + 6]
+            width = data[offset + 7] << 8 | data[offset + 8]
+            return width, height
+        offset += 2 + (data[offset + 2] << 8 | data[offset + 3])
+    return None
+
+
+def fitted_size(width, height, resolution=None):
+    """Taille (largeur, hauteur) de la frame une fois ramenée dans la résolution de travail"""
+    max_width, max_height = resolution or PostureConfig.VIDEO_RESOLUTION
+    scale = min(max_width / width, max_height / height)
+    if scale >= 1:
+        return width, height
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def reduction_factor(width, height, resolution=None):
+    """Plus forte réduction au décodage qui laisse la frame au moins aussi grande que la frame de travail"""
+    max_width, max_height = resolution or PostureConfig.VIDEO_RESOLUTION
+    limit = max(width / max_width, height / max_height)
+    for factor, _ in _REDUCED_FLAGS:
+        if factor <= limit:
+            return factor
+    return 1
+
+
+def decode_frame(image_bytes, resolution=None):
+    """
+    Décode une image JPEG/PNG/WebP en frame RGB
+
+    Les JPEG plus grands que la résolution de travail sont décodés à
+    échelle réduite (1/2, 1/4 ou 1/8) : la frame de travail obtenue ensuite
+    est de même taille qu'avec un décodage complet.
+
+    Returns:
+        np.ndarray (H, W, 3) RGB, ou None si l'image est illisible
+    """
+    data = np.frombuffer(image_bytes, np.uint8)
+
+    flag = cv2.IMREAD_COLOR
+    size = jpeg_size(image_bytes)
+    if size is not None and min(size) > 0:
+        factor = reduction_factor(*size, resolution)
+        flag = dict(_REDUCED_FLAGS).get(factor, cv2.IMREAD_COLOR)
+
+    if _IMREAD_RGB is None:
+        frame = cv2.imdecode(data, flag)
+        if frame is not None:
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame)
+        return frame
+    # Bits de réduction conservés, BGR remplacé par RGB
+    return cv2.imdecode(data, (flag & ~cv2.IMREAD_COLOR) | _IMREAD_RGB)
+
+
+def working_frame(frame, buffers=None, rgb=True, resolution=None):
+    """
+    Frame RGB à la résolution de travail (tampon `work` de la session)
+
+    Une frame RGB déjà à la bonne taille est retournée telle quelle ; une
+    frame BGR (vidéo, corpus enregistré) est convertie une seule fois,
+    directement dans le tampon.
+    """
+    height, width = frame.shape[:2]
+    size = fitted_size(width, height, resolution)
+
+    if size == (width, height):
+        if rgb:
+            return frame
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=_buffer(buffers, 'work', frame.shape))
+
+    work = cv2.resize(
+        frame, size, dst=_buffer(buffers, 'work', (size[1], size[0], 3)), interpolation=cv2.INTER_AREA
+    )
+    if not rgb:
+        cv2.cvtColor(work, cv2.COLOR_BGR2RGB, dst=work)
+    return work
+
+
+def annotation_canvas(work, buffers=None):
+    """Copie BGR de la frame de travail (tampon `annotated`), à dessiner puis encoder en JPEG"""
+    return cv2.cvtColor(work, cv2.COLOR_RGB2BGR, dst=_buffer(buffers, 'annotated', work.shape))
@@ -0,0 +1,83 @@
+# posture_app/analyzer/geometry.py
+
+"""
+Calcul vectorisé des métriques de posture.
+
+Les landmarks sont convertis une seule fois en tableau NumPy (33, 4)
+[x, y, z, visibilité] ; toutes les métriques sont ensuite calculées en une
+passe. Les mêmes fonctions acceptent un lot (N, 33, 4) : re-scorer une
+session enregistrée ou un lot de frames coûte un seul appel NumPy.
+"""
+
+import numpy as np
+
+from .config import PostureConfig
+
+# Indices des landmarks MediaPipe Pose utilisés
+NOSE = 0
+LEFT_SHOULDER = 11
+RIGHT_SHOULDER = 12
+LEFT_HIP = 23
+LEFT_KNEE = 25
+
+NUM_LANDMARKS = 33
+
+
+def landmarks_to_array(landmarks):
+    """Convertit des landmarks MediaPipe en tableau (33, 4) float32"""
+    return np.array(
+        [(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks],
+        dtype=np.float32
+    )
+
+
+def angle_between(a, b, c):
+    """Angle ABC en degrés (0-180) ; a, b, c : tableaux (..., 2)"""
+    radians = np.arctan2(c[..., 1] - b[..., 1], c[..., 0] - b[..., 0]) - \
+              np.arctan2(a[..., 1] - b[..., 1], a[..., 0] - b[..., 0])
+    angle = np.abs(np.degrees(radians))
+    return np.where(angle > 180, 360 - angle, angle)
+
+
+def vertical_angle(a, b):
+    """Angle du segment AB par rapport à la verticale en degrés"""
+    return np.abs(np.degrees(np.arctan2(b[..., 0] - a[..., 0], a[..., 1] - b[..., 1])))
+
+
+def compute_posture_metrics(points):
+    """
+    Calcule toutes les métriques de posture en une passe
+
+    Args:
+        points: Tableau (33, 4) ou (N, 33, 4) de landmarks
+
+    Returns:
+        dict de tableaux de forme () ou (N,) : neck_angle, back_angle,
+        shoulder_diff, neck_ok, back_ok, shoulders_ok, is_good_posture
+    """
+    xy = np.asarray(points, dtype=np.float64)[..., :2]
+    if xy.shape[-2] != NUM_LANDMARKS:
+        raise ValueError(f'{NUM_LANDMARKS} landmarks attendus, {xy.shape[-2]} reçus')
+
+    left_shoulder = xy[..., LEFT_SHOULDER, :]
+    right_shoulder = xy[..., RIGHT_SHOULDER, :]
+    mid_shoulder = (left_shoulder + right_shoulder) / 2
+
+    neck_angle = vertical_angle(xy[..., NOSE, :], mid_shoulder)
+    back_angle = angle_between(left_shoulder, xy[..., LEFT_HIP, :], xy[..., LEFT_KNEE, :])
+    shoulder_diff = np.abs(left_shoulder[..., 1] - right_shoulder[..., 1]) * 100
+
+    # Seuils de PostureConfig
+    neck_ok = neck_angle < PostureConfig.NECK_ANGLE_MAX
+    back_ok = back_angle >= PostureConfig.BACK_ANGLE_MIN
+    shoulders_ok = shoulder_diff <= PostureConfig.SHOULDER_DIFF_MAX
+
+    return {
+        'neck_angle': neck_angle,
+        'back_angle': back_angle,
+        'shoulder_diff': shoulder_diff,
+        'neck_ok': neck_ok,
+        'back_ok': back_ok,
+        'shoulders_ok': shoulders_ok,
+        'is_good_posture': neck_ok & back_ok & shoulders_ok,
+    }
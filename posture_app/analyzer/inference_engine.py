@@ -0,0 +1,382 @@
+# posture_app/analyzer/inference_engine.py
+
+"""
+Moteur d'inférence hors processus.
+
+Les frames sont confiées à un pool de processus de travail, chacun avec ses
+propres détecteurs MediaPipe Pose. Les frames décodées transitent par des
+segments de mémoire partagée (aucune sérialisation de l'image) : le
+processus principal écrit la frame RGB directement dans un emplacement
+réservé au worker, qui ne renvoie que les 33 landmarks.
+
+Les frames d'une même session sont toujours envoyées au même worker pour
+conserver l'état de suivi MediaPipe de la session.
+
+Un worker arrêté (plantage, OOM) est relancé aussitôt : ses frames en cours
+échouent immédiatement au lieu d'attendre INFERENCE_TIMEOUT, et ses
+emplacements sont rendus au nouveau processus. Les modèles qu'un worker n'a
+pas pu charger sont signalés au contrôleur de qualité du processus principal.
+"""
+
+import atexit
+import itertools
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+
+import numpy as np
+
+from .config import PostureConfig
+from .load_control import get_load_controller, register_queue_source
+from .telemetry import inc, register_gauge
+
+logger = logging.getLogger(__name__)
+
+# Messages envoyés aux workers
+_TASK_FRAME = 'frame'
+_TASK_DISCARD = 'discard'
+_TASK_STOP = 'stop'
+
+
+def _worker_main(index, generation, slot_names, tasks, results):
+    """Boucle d'un processus de travail"""
+    from .load_control import MODEL_COMPLEXITIES
+    from .posture_analyzer import _create_pose_detector, _detector_factory
+    from .session_pool import SessionPool
+
+    detectors = SessionPool(
+        factory=_create_pose_detector,
+        max_size=PostureConfig.POSE_POOL_SIZE,
+        idle_timeout=PostureConfig.POSE_POOL_IDLE_TIMEOUT,
+        on_evict=lambda pose: pose.close()
+    )
+    slots = [shared_memory.SharedMemory(name=name) for name in slot_names]
+    # Modèles remplacés par le modèle par défaut dans ce worker (voir _detector_factory)
+    unavailable = get_load_controller().unavailable
+
+    try:
+        while True:
+            kind, payload = tasks.get()
+            if kind == _TASK_STOP:
+                break
+            if kind == _TASK_DISCARD:
+                for model_complexity in MODEL_COMPLEXITIES:
+                    detectors.discard((payload, model_complexity))
+                continue
+
+            task_id, slot, shape, session_id, model_complexity = payload
+            started = time.perf_counter()
+            try:
+                image = np.ndarray(shape, dtype=np.uint8, buffer=slots[slot].buf)
+                image.flags.writeable = False
+                key = (session_id, model_complexity)
+                with detectors.lease(key, _detector_factory(model_complexity)) as pose:
+                    pose_results = pose.process(image)
+                del image
+
+                landmarks = None
+                if pose_results.pose_landmarks:
+                    landmarks = np.array(
+                        [[lm.x, lm.y, lm.z, lm.visibility]
+                         for lm in pose_results.pose_landmarks.landmark],
+                        dtype=np.float32
+                    )
+                error = None
+            except Exception as e:
+                landmarks, error = None, str(e)
+            results.put((
+                task_id, index, generation, slot, landmarks, error,
+                time.perf_counter() - started, tuple(unavailable)
+            ))
+    finally:
+        detectors.clear()
+        for shm in slots:
+            shm.close()
+
+
+class _Worker:
+    """État côté processus principal d'un worker"""
+
+    def __init__(self, index, context, slot_count, slot_size, results):
+        self.index = index
+        self.slots = [
+            shared_memory.SharedMemory(create=True, size=slot_size)
+            for _ in range(slot_count)
+        ]
+        self.free_slots = queue.Queue()  # (génération, emplacement)
+        self.generation = -1
+        self.spawn(context, results)
+
+        # Compteurs (mis à jour sous le verrou du moteur)
+        self.frames = 0
+        self.errors = 0
+        self.busy_time = 0.0
+        self.restarts = 0
+
+    def spawn(self, context, results):
+        """(Re)crée le processus : nouvelle file de tâches, tous les emplacements libres"""
+        self.generation += 1
+        self.pending = 0
+        while True:
+            try:
+                self.free_slots.get_nowait()
+            except queue.Empty:
+                break
+        for slot in range(len(self.slots)):
+            self.free_slots.put((self.generation, slot))
+        # File neuve : le processus arrêté a pu mourir en tenant le verrou de l'ancienne
+        self.tasks = context.Queue()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(self.index, self.generation, [shm.name for shm in self.slots], self.tasks, results),
+            name=f'posture-inference-{self.index}',
+            daemon=True
+        )
+
+
+class InferenceEngine:
+    """
+    Pool de processus d'inférence MediaPipe.
+
+    Args:
+        workers: Nombre de processus de travail
+        slots_per_worker: Frames pouvant être en attente par worker
+        max_frame_size: (largeur, hauteur) maximale d'une frame
+        timeout: Délai max d'attente d'un résultat (secondes)
+    """
+
+    def __init__(self, workers=2, slots_per_worker=2, max_frame_size=(1920, 1080), timeout=5.0):
+        width, height = max_frame_size
+        self.slot_size = width * height * 3
+        self.timeout = timeout
+        self.started_at = time.monotonic()
+
+        self._context = multiprocessing.get_context('spawn')
+        self._results = self._context.Queue()
+        self._workers = [
+            _Worker(index, self._context, slots_per_worker, self.slot_size, self._results)
+            for index in range(max(1, int(workers)))
+        ]
+        self._futures = {}  # task_id -> (Future, worker)
+        self._task_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._closed = False
+
+        for worker in self._workers:
+            worker.process.start()
+
+        self._collector = threading.Thread(
+            target=self._collect_results, name='posture-inference-results', daemon=True
+        )
+        self._collector.start()
+        self._supervisor = threading.Thread(
+            target=self._supervise, name='posture-inference-supervisor', daemon=True
+        )
+        self._supervisor.start()
+
+    def infer(self, frame, session_id=None, model_complexity=None):
+        """
+        Détecte la pose dans une frame RGB avec le modèle `model_complexity`
+        (MEDIAPIPE_MODEL_COMPLEXITY par défaut)
+
+        Returns:
+            np.ndarray (33, 4) float32 [x, y, z, visibilité] ou None
+        """
+        if frame.size > self.slot_size:
+            raise ValueError('Frame trop grande pour le moteur d\'inférence')
+        if model_complexity is None:
+            model_complexity = PostureConfig.MEDIAPIPE_MODEL_COMPLEXITY
+
+        worker = self._route(session_id)
+        try:
+            generation, slot = worker.free_slots.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError('Moteur d\'inférence saturé')
+
+        # Frame copiée directement dans la mémoire partagée
+        shape = frame.shape
+        image = np.ndarray(shape, dtype=np.uint8, buffer=worker.slots[slot].buf)
+        np.copyto(image, frame)
+        del image
+
+        future = Future()
+        with self._lock:
+            if worker.generation != generation:
+                # Worker relancé entre-temps : tous ses emplacements ont été rendus
+                raise RuntimeError('Worker d\'inférence relancé')
+            task_id = next(self._task_ids)
+            self._futures[task_id] = (future, worker)
+            worker.pending += 1
+            worker.tasks.put((_TASK_FRAME, (task_id, slot, shape, session_id, model_complexity)))
+
+        try:
+            landmarks, error = future.result(timeout=self.timeout)
+        except Exception:
+            with self._lock:
+                self._futures.pop(task_id, None)
+            raise
+        if error:
+            raise RuntimeError(error)
+        return landmarks
+
+    def discard_session(self, session_id):
+        """Libère le détecteur d'une session dans son worker"""
+        self._route(session_id).tasks.put((_TASK_DISCARD, session_id))
+
+    def queue_depth(self):
+        """Frames confiées aux workers et pas encore rendues (emplacements occupés)"""
+        return sum(worker.pending for worker in self._workers)
+
+    def stats(self):
+        """Compteurs de file d'attente et d'utilisation des workers"""
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        with self._lock:
+            per_worker = [
+                {
+                    'worker': worker.index,
+                    'alive': worker.process.is_alive(),
+                    'pending': worker.pending,
+                    'frames': worker.frames,
+                    'errors': worker.errors,
+                    'restarts': worker.restarts,
+                    'busy_time': round(worker.busy_time, 3),
+                    'utilization': round(min(worker.busy_time / elapsed, 1.0), 4),
+                }
+                for worker in self._workers
+            ]
+        return {
+            'workers': len(self._workers),
+            'queue_depth': sum(worker['pending'] for worker in per_worker),
+            'per_worker': per_worker,
+        }
+
+    def close(self):
+        """Arrête les workers et libère la mémoire partagée"""
+        if self._closed:
+            return
+        self._closed = True
+
+        for worker in self._workers:
+            worker.tasks.put((_TASK_STOP, None))
+        for worker in self._workers:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+        self._results.put(None)
+
+        for worker in self._workers:
+            for shm in worker.slots:
+                shm.close()
+                shm.unlink()
+
+    # ------------------------------------------------------------------
+
+    def _route(self, session_id):
+        """Affinité de session ; les frames sans session vont au worker le moins chargé"""
+        if session_id is None:
+            with self._lock:
+                return min(self._workers, key=lambda worker: worker.pending)
+        return self._workers[hash(session_id) % len(self._workers)]
+
+    def _collect_results(self):
+        controller = get_load_controller()
+        while True:
+            message = self._results.get()
+            if message is None:
+                break
+
+            task_id, index, generation, slot, landmarks, error, busy, unavailable = message
+            for model_complexity in unavailable:
+                controller.mark_unavailable(model_complexity)
+
+            worker = self._workers[index]
+            with self._lock:
+                if generation != worker.generation:
+                    # Résultat d'un processus arrêté : tâche déjà échouée, emplacement déjà rendu
+                    continue
+                worker.pending -= 1
+                worker.frames += 1
+                worker.busy_time += busy
+                if error:
+                    worker.errors += 1
+                entry = self._futures.pop(task_id, None)
+            worker.free_slots.put((generation, slot))
+
+            if entry is not None:
+                entry[0].set_result((landmarks, error))
+
+    def _supervise(self):
+        """Relance les workers arrêtés et fait échouer leurs frames en cours"""
+        while not self._closed:
+            sentinels = {worker.process.sentinel: worker for worker in self._workers}
+            for sentinel in wait(list(sentinels), timeout=1.0):
+                if not self._closed:
+                    self._respawn(sentinels[sentinel])
+
+    def _respawn(self, worker):
+        worker.process.join(timeout=1)  # Récupère le code de sortie du processus arrêté
+        exitcode = worker.process.exitcode
+        with self._lock:
+            if self._closed:
+                return
+            lost = [
+                task_id for task_id, (_, owner) in self._futures.items() if owner is worker
+            ]
+            futures = [self._futures.pop(task_id)[0] for task_id in lost]
+            worker.errors += len(futures)
+            worker.restarts += 1
+            worker.spawn(self._context, self._results)
+        worker.process.start()
+
+        logger.error(
+            "Worker d'inférence %d arrêté (code %s) : relancé, %d frames en cours perdues",
+            worker.index, exitcode, len(futures)
+        )
+        inc('posture_inference_worker_restarts_total')
+        for future in futures:
+            future.set_result((None, 'Worker d\'inférence arrêté'))
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_inference_engine():
+    """Moteur d'inférence partagé, ou None si l'inférence reste dans le processus"""
+    global _engine
+    if PostureConfig.INFERENCE_WORKERS <= 0:
+        return None
+
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = InferenceEngine(
+                    workers=PostureConfig.INFERENCE_WORKERS,
+                    slots_per_worker=PostureConfig.INFERENCE_SLOTS_PER_WORKER,
+                    max_frame_size=PostureConfig.INFERENCE_MAX_FRAME_SIZE,
+                    timeout=PostureConfig.INFERENCE_TIMEOUT
+                )
+                atexit.register(_engine.close)
+    return _engine
+
+
+def _worker_utilization():
+    if _engine is None:
+        return {}
+    return {
+        (('worker', str(worker['worker'])),): worker['utilization']
+        for worker in _engine.stats()['per_worker']
+    }
+
+
+# Lus à la collecte, sans démarrer le moteur s'il n'est pas encore utilisé
+register_gauge('posture_inference_queue_depth', "Frames en attente dans les workers d'inférence",
+               lambda: _engine.stats()['queue_depth'] if _engine is not None else 0)
+register_queue_source(lambda: _engine.queue_depth() if _engine is not None else 0)
+register_gauge('posture_inference_worker_utilization', "Part du temps passée en inférence, par worker",
+               _worker_utilization)
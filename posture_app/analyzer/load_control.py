@@ -0,0 +1,266 @@
+# posture_app/analyzer/load_control.py
+
+"""
+Qualité d'analyse adaptée à la charge du processus.
+
+Plutôt que de laisser les frames attendre jusqu'à expiration, toutes les
+sessions passent par des paliers de qualité (QUALITY_LEVELS) : modèle
+MediaPipe plus léger, résolution de travail réduite, puis landmarks seuls
+au lieu de l'image annotée. Le contrôleur mesure la latence des dernières
+inférences et la file d'attente des frames (pool des vues async, workers
+d'inférence : register_queue_source) ; il descend d'un
+palier dès que la p95 dépasse la cible et ne remonte qu'après un délai
+passé nettement sous la cible (délai doublé à chaque remontée ratée, pour
+éviter les oscillations).
+
+Le contrôleur ne remonte jamais vers un modèle plus lourd que
+MEDIAPIPE_MODEL_COMPLEXITY s'il n'est pas installé (seul « full » est livré
+avec mediapipe) : sauf QUALITY_HEAVY_MODEL, le palier model_complexity=2
+utilise alors le modèle par défaut. Les sessions changent de détecteur à
+leur frame suivante, au plus QUALITY_MAX_SWITCHES par seconde.
+"""
+
+import importlib.util
+import logging
+import os
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+import numpy as np
+
+from .config import PostureConfig
+from .telemetry import inc, register_gauge
+
+logger = logging.getLogger(__name__)
+
+# Valeurs possibles de model_complexity (lite, full, heavy)
+MODEL_COMPLEXITIES = (0, 1, 2)
+
+# Fichier du modèle de pose de chaque complexité dans le paquet mediapipe
+_MODEL_FILES = {
+    0: 'pose_landmark_lite.tflite',
+    1: 'pose_landmark_full.tflite',
+    2: 'pose_landmark_heavy.tflite',
+}
+
+
+@lru_cache(maxsize=None)
+def model_installed(model_complexity):
+    """Le modèle de pose de cette complexité est déjà présent (pas de téléchargement)"""
+    spec = importlib.util.find_spec('mediapipe')
+    if spec is None or not spec.submodule_search_locations:
+        return False
+    path = os.path.join(
+        spec.submodule_search_locations[0], 'modules', 'pose_landmark', _MODEL_FILES[model_complexity]
+    )
+    return os.path.exists(path)
+
+
+class QualityLevel:
+    """Palier de qualité appliqué aux frames d'une session"""
+
+    __slots__ = ('level', 'model_complexity', 'resolution', 'annotate', 'degraded')
+
+    def __init__(self, level, model_complexity, resolution, annotate, degraded=False):
+        self.level = level
+        self.model_complexity = model_complexity
+        self.resolution = tuple(resolution)
+        self.annotate = annotate
+        self.degraded = degraded
+
+    def as_dict(self):
+        """Palier tel que renvoyé au client avec chaque résultat"""
+        return {
+            'level': self.level,
+            'model_complexity': self.model_complexity,
+            'resolution': list(self.resolution),
+            'annotated': self.annotate,
+            'degraded': self.degraded,
+        }
+
+    def with_complexity(self, model_complexity):
+        """Même palier avec un autre modèle (session qui n'a pas encore changé de détecteur)"""
+        return QualityLevel(self.level, model_complexity, self.resolution, self.annotate, self.degraded)
+
+
+class LoadController:
+    """
+    Choisit le palier de qualité courant à partir de la latence p95 et des
+    frames en cours d'analyse (décision au fil des frames, sans thread)
+    """
+
+    def __init__(self, levels=None, default_level=None):
+        self.levels = tuple(levels or PostureConfig.QUALITY_LEVELS)
+        if default_level is None:
+            default_level = PostureConfig.QUALITY_DEFAULT_LEVEL
+        self.default_level = min(max(int(default_level), 0), len(self.levels) - 1)
+        self.level = self.default_level
+        self.pinned_complexity = None
+        self.unavailable = set()   # Complexités dont le modèle n'a pas pu être chargé
+        self.in_flight = 0
+        self._queue_sources = []   # Fonctions renvoyant des frames en attente d'analyse
+
+        self._samples = deque()    # (instant, secondes) des dernières inférences
+        self._changed_at = time.monotonic()
+        self._upgraded = False     # Le dernier changement était une remontée
+        self._failures = {}        # Palier -> remontées ratées (délai doublé)
+        self._next_check = 0.0
+        self._switch_second = 0.0  # Début de la seconde courante des changements de détecteur
+        self._switches = 0
+        self._lock = threading.Lock()
+
+    def current(self):
+        """Palier à appliquer à la prochaine frame"""
+        level = self.default_level if self.pinned_complexity is not None else self.level
+        complexity, resolution, annotate = self.levels[level]
+        if self.pinned_complexity is not None:
+            complexity = self.pinned_complexity
+        elif not self._allowed(complexity):
+            complexity = PostureConfig.MEDIAPIPE_MODEL_COMPLEXITY
+        return QualityLevel(level, complexity, resolution, annotate, degraded=level > self.default_level)
+
+    def begin(self):
+        """Une frame entre en analyse"""
+        with self._lock:
+            self.in_flight += 1
+
+    def end(self, seconds=None):
+        """Fin d'analyse d'une frame ; `seconds` : durée si une inférence a eu lieu"""
+        now = time.monotonic()
+        with self._lock:
+            self.in_flight -= 1
+            if seconds is not None:
+                self._samples.append((now, seconds))
+            if PostureConfig.QUALITY_ADAPTIVE and now >= self._next_check:
+                self._next_check = now + PostureConfig.QUALITY_CHECK_INTERVAL
+                self._check(now)
+
+    def allow_switch(self):
+        """Une session peut-elle recharger son détecteur maintenant (QUALITY_MAX_SWITCHES par seconde)"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._switch_second >= 1.0:
+                self._switch_second = now
+                self._switches = 0
+            if self._switches >= PostureConfig.QUALITY_MAX_SWITCHES:
+                return False
+            self._switches += 1
+            return True
+
+    def add_queue_source(self, source):
+        """Ajoute une file d'attente (fonction sans argument -> frames) à la profondeur mesurée"""
+        self._queue_sources.append(source)
+
+    def queue_depth(self):
+        """Frames en attente ou en cours d'analyse dans le processus"""
+        # Les analyses hors pool (commandes, appels directs) ne passent que par begin()/end()
+        return max(sum(source() for source in self._queue_sources), self.in_flight)
+
+    def pin(self, model_complexity):
+        """Fixe model_complexity (benchmarks) ; None rend la main au contrôleur"""
+        with self._lock:
+            self.pinned_complexity = model_complexity
+
+    def mark_unavailable(self, model_complexity):
+        """Modèle impossible à charger : ses paliers utilisent la complexité par défaut"""
+        with self._lock:
+            if model_complexity in self.unavailable:
+                return
+            self.unavailable.add(model_complexity)
+        logger.warning(
+            "Modèle MediaPipe model_complexity=%d indisponible : remplacé par %d",
+            model_complexity, PostureConfig.MEDIAPIPE_MODEL_COMPLEXITY
+        )
+
+    def p95(self):
+        with self._lock:
+            return self._p95()
+
+    # ------------------------------------------------------------------
+
+    def _allowed(self, model_complexity):
+        """Complexité utilisable sans téléchargement imprévu ni échec de chargement connu"""
+        if model_complexity in self.unavailable:
+            return False
+        return (
+            model_complexity <= PostureConfig.MEDIAPIPE_MODEL_COMPLEXITY
+            or PostureConfig.QUALITY_HEAVY_MODEL
+            or model_installed(model_complexity)
+        )
+
+    def _p95(self):
+        if not self._samples:
+            return 0.0
+        return float(np.percentile([seconds for _, seconds in self._samples], 95))
+
+    def _check(self, now):
+        while self._samples and self._samples[0][0] < now - PostureConfig.QUALITY_WINDOW:
+            self._samples.popleft()
+
+        depth = self.queue_depth()
+        queued = depth > PostureConfig.QUALITY_MAX_QUEUE_DEPTH
+        if len(self._samples) < PostureConfig.QUALITY_MIN_SAMPLES and not queued:
+            return
+
+        if self._upgraded and now - self._changed_at >= PostureConfig.QUALITY_RECOVERY_DELAY:
+            # Remontée confirmée : une baisse ultérieure ne lui sera pas imputée
+            self._upgraded = False
+            self._failures.pop(self.level, None)
+
+        p95 = self._p95()
+        target = PostureConfig.QUALITY_TARGET_P95
+        if p95 > target or queued:
+            if self.level < len(self.levels) - 1:
+                if self._upgraded:
+                    # La remontée vers ce palier n'a pas tenu : attendre plus longtemps
+                    self._failures[self.level] = self._failures.get(self.level, 0) + 1
+                self._move(self.level + 1, now, p95, depth, upgraded=False)
+            return
+
+        target_level = self.level - 1
+        if target_level < 0 or p95 >= target * PostureConfig.QUALITY_RECOVERY_RATIO:
+            return
+        if not self._allowed(self.levels[target_level][0]):
+            return
+        delay = PostureConfig.QUALITY_RECOVERY_DELAY * 2 ** min(self._failures.get(target_level, 0), 5)
+        if now - self._changed_at >= delay:
+            self._move(target_level, now, p95, depth, upgraded=True)
+
+    def _move(self, level, now, p95, depth, upgraded):
+        previous, self.level = self.level, level
+        self._changed_at = now
+        self._upgraded = upgraded
+        self._samples.clear()  # Mesures du palier précédent
+
+        quality = self.current()
+        direction = 'up' if upgraded else 'down'
+        inc('posture_quality_changes_total', labels=(('direction', direction),))
+        (logger.info if upgraded else logger.warning)(
+            "Qualité d'analyse %s du palier %d au palier %d (model_complexity=%d, %dx%d, image=%s) : "
+            "p95 %.0f ms, %d frames en attente",
+            'remontée' if upgraded else 'abaissée', previous, level, quality.model_complexity,
+            quality.resolution[0], quality.resolution[1], 'oui' if quality.annotate else 'non',
+            p95 * 1000, depth
+        )
+
+
+_controller = LoadController()
+
+register_gauge('posture_quality_level', 'Palier de qualité courant (0 = le plus fin)',
+               lambda: _controller.current().level)
+
+
+def get_load_controller():
+    return _controller
+
+
+def register_queue_source(source):
+    """Compte les frames en attente d'une file (`source()`) dans la décision de qualité"""
+    _controller.add_queue_source(source)
+
+
+def current_quality():
+    """Palier de qualité à appliquer à la prochaine frame"""
+    return _controller.current()
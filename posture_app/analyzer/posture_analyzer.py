@@ -3,102 +3,189 @@
 import cv2
 import mediapipe as mp
 import numpy as np
-import math
 import base64
+import logging
+import threading
+import time
 from collections import deque
+from contextlib import nullcontext
+from mediapipe.framework.formats import landmark_pb2
+
+from .config import PostureConfig
+from .frame_gate import GATE_REJECT, GATE_REUSE, FrameGate, rejected_result
+from .frame_ingest import FrameBuffers, annotation_canvas, working_frame
+from .geometry import angle_between, compute_posture_metrics, landmarks_to_array, vertical_angle
+from .inference_engine import get_inference_engine
+from .load_control import MODEL_COMPLEXITIES, current_quality, get_load_controller
+from .profiling import stage
+from .roi import RoiTracker, map_to_frame
+from .session_pool import SessionPool
+from .streaming_stats import RunningStats
+from .temporal import TemporalPostureFilter
+from .telemetry import inc, observe, register_gauge
+
+logger = logging.getLogger(__name__)
 
 mp_pose = mp.solutions.pose
 mp_drawing = mp.solutions.drawing_utils
 
-# Initialiser MediaPipe Pose (singleton)
-_pose_detector = None
 
+def _create_pose_detector(model_complexity=None):
+    """Crée un nouveau détecteur MediaPipe Pose"""
+    if model_complexity is None:
+        model_complexity = PostureConfig.MEDIAPIPE_MODEL_COMPLEXITY
+    return mp_pose.Pose(
+        min_detection_confidence=PostureConfig.MEDIAPIPE_MIN_DETECTION_CONFIDENCE,
+        min_tracking_confidence=PostureConfig.MEDIAPIPE_MIN_TRACKING_CONFIDENCE,
+        model_complexity=model_complexity
+    )
+
+
+def _detector_factory(model_complexity):
+    """Fabrique de détecteurs d'une complexité ; complexité par défaut si le modèle manque"""
+    def create():
+        try:
+            return _create_pose_detector(model_complexity)
+        except Exception:
+            if model_complexity == PostureConfig.MEDIAPIPE_MODEL_COMPLEXITY:
+                raise
+            # Modèle lite/heavy absent (téléchargé à la première utilisation)
+            logger.exception("Chargement du modèle MediaPipe model_complexity=%d impossible", model_complexity)
+            get_load_controller().mark_unavailable(model_complexity)
+            return _create_pose_detector()
+    return create
+
+
+# Un détecteur par session et par complexité de modèle : chaque flux garde
+# son propre état de suivi (mode tracking, bien moins coûteux que la
+# détection complète) et les sessions peuvent être traitées en parallèle
+# sans verrou global. Les frames sans session utilisent le détecteur de leur
+# thread d'analyse (voir _detector_key).
+_detector_pool = SessionPool(
+    factory=_create_pose_detector,
+    max_size=PostureConfig.POSE_POOL_SIZE,
+    idle_timeout=PostureConfig.POSE_POOL_IDLE_TIMEOUT,
+    on_evict=lambda pose: pose.close()
+)
+
+
+register_gauge('posture_pose_detectors', 'Détecteurs MediaPipe ouverts dans ce processus',
+               lambda: len(_detector_pool))
+
+
+def get_pose_detector(session_id=None, model_complexity=None):
+    """Obtenir le détecteur de pose associé à une session (complexité du palier courant par défaut)"""
+    if model_complexity is None:
+        model_complexity = current_quality().model_complexity
+    return _detector_pool.get(_detector_key(session_id, model_complexity), _detector_factory(model_complexity))
+
+
+def _detector_key(session_id, model_complexity):
+    """
+    Clé du détecteur dans le pool : par session ; les frames sans session
+    ont un détecteur par thread d'analyse plutôt qu'un seul partagé sous verrou
+    """
+    if session_id is None:
+        session_id = ('thread', threading.get_ident())
+    return (session_id, model_complexity)
 
-def get_pose_detector():
-    """Obtenir l'instance du détecteur de pose (singleton)"""
-    global _pose_detector
-    if _pose_detector is None:
-        _pose_detector = mp_pose.Pose(
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5,
-            model_complexity=1  # Ajouté pour de meilleures performances
-        )
-    return _pose_detector
 
+def configure_pose_detector(model_complexity):
+    """Fixe la complexité de tous les détecteurs (None : adaptée à la charge) et libère les existants"""
+    get_load_controller().pin(model_complexity)
+    _detector_pool.clear()
+
+
+def release_pose_detector(session_id):
+    """Libère le détecteur d'une session terminée"""
+    for model_complexity in MODEL_COMPLEXITIES:
+        _detector_pool.discard((session_id, model_complexity))
+
+    engine = get_inference_engine()
+    if engine is not None:
+        engine.discard_session(session_id)
+
+
+class SessionFrameState:
+    """État d'analyse d'une session en dehors du détecteur"""
+
+    def __init__(self):
+        self.gate = FrameGate()     # Filtre avant inférence
+        self.roi = RoiTracker()     # Région d'intérêt autour de la personne
+        self.temporal = TemporalPostureFilter()  # Lissage et hystérésis des verdicts
+        self.buffers = FrameBuffers()  # Frame de travail et image annotée réutilisées
+        self.model_complexity = None   # Complexité du détecteur actuel de la session
 
-def calculate_angle(a, b, c):
-    """Calcule l'angle entre 3 points"""
-    a = np.array(a)
-    b = np.array(b)
-    c = np.array(c)
 
-    radians = math.atan2(c[1] - b[1], c[0] - b[0]) - \
-              math.atan2(a[1] - b[1], a[0] - b[0])
-    angle = abs(math.degrees(radians))
+# État par session (même politique d'éviction que les détecteurs)
+_session_states = SessionPool(
+    factory=SessionFrameState,
+    max_size=PostureConfig.POSE_POOL_SIZE,
+    idle_timeout=PostureConfig.POSE_POOL_IDLE_TIMEOUT
+)
 
-    if angle > 180:
-        angle = 360 - angle
 
-    return angle
+def get_session_state(session_id):
+    """État d'analyse d'une session ; None sans session (jamais partagé entre clients)"""
+    if session_id is None:
+        return None
+    return _session_states.get(session_id)
+
+
+def release_session(session_id):
+    """Libère tout l'état d'analyse d'une session terminée"""
+    release_pose_detector(session_id)
+    _session_states.discard(session_id)
+
+
+def _array_to_landmark_list(landmarks):
+    """Reconstruit la liste de landmarks MediaPipe à partir d'un tableau (33, 4)"""
+    landmark_list = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z, visibility in landmarks.tolist():
+        landmark_list.landmark.add(x=x, y=y, z=z, visibility=visibility)
+    return landmark_list
+
+
+def _as_points(landmarks):
+    """Accepte des landmarks MediaPipe ou un tableau (33, 4)"""
+    if isinstance(landmarks, np.ndarray):
+        return landmarks
+    return landmarks_to_array(landmarks)
+
+
+def calculate_angle(a, b, c):
+    """Calcule l'angle entre 3 points"""
+    a, b, c = (np.asarray(p, dtype=np.float64)[..., :2] for p in (a, b, c))
+    return float(angle_between(a, b, c))
 
 
 def calculate_vertical_angle(a, b):
     """Calcule l'angle par rapport à la verticale"""
-    angle = math.degrees(math.atan2(b[0] - a[0], a[1] - b[1]))
-    return abs(angle)
+    a, b = (np.asarray(p, dtype=np.float64)[..., :2] for p in (a, b))
+    return float(vertical_angle(a, b))
 
 
 def analyze_neck_posture(landmarks):
     """Analyse la posture du cou"""
-    try:
-        nose = [landmarks[mp_pose.PoseLandmark.NOSE.value].x,
-                landmarks[mp_pose.PoseLandmark.NOSE.value].y]
-        left_shoulder = [landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].x,
-                         landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].y]
-        right_shoulder = [landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value].x,
-                          landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value].y]
-
-        mid_shoulder = [(left_shoulder[0] + right_shoulder[0]) / 2,
-                        (left_shoulder[1] + right_shoulder[1]) / 2]
-
-        neck_angle = calculate_vertical_angle(nose, mid_shoulder)
-
-        return neck_angle, neck_angle < 15
-    except Exception as e:
-        print(f"Erreur analyse cou: {e}")
-        return 0, True
+    metrics = compute_posture_metrics(_as_points(landmarks))
+    return float(metrics['neck_angle']), bool(metrics['neck_ok'])
 
 
 def analyze_back_posture(landmarks):
     """Analyse la posture du dos"""
-    try:
-        left_shoulder = [landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].x,
-                         landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].y]
-        left_hip = [landmarks[mp_pose.PoseLandmark.LEFT_HIP.value].x,
-                    landmarks[mp_pose.PoseLandmark.LEFT_HIP.value].y]
-        left_knee = [landmarks[mp_pose.PoseLandmark.LEFT_KNEE.value].x,
-                     landmarks[mp_pose.PoseLandmark.LEFT_KNEE.value].y]
-
-        back_angle = calculate_angle(left_shoulder, left_hip, left_knee)
-
-        return back_angle, back_angle >= 160
-    except Exception as e:
-        print(f"Erreur analyse dos: {e}")
-        return 180, True
+    metrics = compute_posture_metrics(_as_points(landmarks))
+    return float(metrics['back_angle']), bool(metrics['back_ok'])
 
 
 def analyze_shoulder_alignment(landmarks):
     """Analyse l'alignement des épaules"""
-    try:
-        left_shoulder = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-        right_shoulder = landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value]
+    metrics = compute_posture_metrics(_as_points(landmarks))
+    return float(metrics['shoulder_diff']), bool(metrics['shoulders_ok'])
 
-        shoulder_diff = abs(left_shoulder.y - right_shoulder.y) * 100
 
-        return shoulder_diff, shoulder_diff <= 15
-    except Exception as e:
-        print(f"Erreur analyse épaules: {e}")
-        return 0, True
+def landmarks_to_list(points, precision=4):
+    """Convertit le tableau (33, 4) en liste compacte [x, y, z, visibilité]"""
+    return np.round(np.asarray(points, dtype=np.float64), precision).tolist()
 
 
 def get_posture_problems(neck_ok, back_ok, shoulders_ok):
@@ -115,93 +202,418 @@ def get_posture_problems(neck_ok, back_ok, shoulders_ok):
     return problems
 
 
-def analyze_frame(frame):
+# Modes de réponse de analyze_frame : image annotée ou landmarks seuls
+OUTPUT_IMAGE, OUTPUT_LANDMARKS = PostureConfig.FRAME_OUTPUT_MODES
+
+
+def _infer(image, session_id, model_complexity):
+    """Inférence MediaPipe sur une image RGB ; tableau (33, 4) ou None"""
+    engine = get_inference_engine()
+
+    if engine is not None:
+        # Inférence dans un processus de travail (frame en mémoire partagée)
+        with stage('engine_infer'):
+            return engine.infer(image, session_id, model_complexity)
+
+    # Détection de la posture (détecteur réservé à la session)
+    key = _detector_key(session_id, model_complexity)
+    with _detector_pool.lease(key, _detector_factory(model_complexity)) as pose:
+        with stage('pose_process'):
+            results = pose.process(image)
+
+    if not results.pose_landmarks:
+        return None
+    return landmarks_to_array(results.pose_landmarks.landmark)
+
+
+def _detect_pose(work, session_id, state, model_complexity):
+    """
+    Détecte la pose dans une frame de travail RGB (voir frame_ingest)
+
+    Si la session suit déjà une personne, la frame est recadrée sur sa
+    région d'intérêt. Si la personne n'est plus trouvée dans la région, la
+    frame entière est analysée à nouveau.
+
+    Returns:
+        tableau (33, 4) normalisé sur la frame entière, ou None
+    """
+    height, width = work.shape[:2]
+
+    region = state.roi.region(width, height) if state is not None else None
+    points = None
+    if region is not None:
+        x0, y0, x1, y1 = region
+        points = _infer(work[y0:y1, x0:x1], session_id, model_complexity)
+        if points is not None:
+            points = map_to_frame(points, region, width, height)
+
+    if points is None:
+        points = _infer(work, session_id, model_complexity)
+
+    if state is not None:
+        if points is None:
+            state.roi.reset()
+        else:
+            state.roi.update(points)
+
+    return points
+
+
+def _prepare_frame(frame, rgb, buffers, quality):
+    """Frame de travail RGB (résolution du palier, tampon de la session)"""
+    with stage('resize'):
+        return working_frame(frame, buffers, rgb=rgb, resolution=quality.resolution)
+
+
+def _session_quality(session_id, state, quality):
+    """
+    Palier appliqué à la session : si le palier a changé de modèle, le
+    détecteur de l'ancien modèle est libéré. Les rechargements sont étalés
+    (QUALITY_MAX_SWITCHES par seconde) : en attendant son tour, la session
+    garde son modèle actuel.
+    """
+    if state is None or state.model_complexity == quality.model_complexity:
+        return quality
+    if state.model_complexity is not None:
+        if not get_load_controller().allow_switch():
+            return quality.with_complexity(state.model_complexity)
+        release_pose_detector(session_id)
+    state.model_complexity = quality.model_complexity
+    return quality
+
+
+def _session_buffers(state):
+    """Tampons de la session réservés pour la frame en cours (aucun sans session)"""
+    return state.buffers.lease() if state is not None else nullcontext()
+
+
+def _build_result(points, metrics, output, image=None):
+    """Construit le résultat d'une frame détectée à partir de ses métriques"""
+    neck_ok = bool(metrics['neck_ok'])
+    back_ok = bool(metrics['back_ok'])
+    shoulders_ok = bool(metrics['shoulders_ok'])
+
+    # Identifier les problèmes
+    problems = get_posture_problems(neck_ok, back_ok, shoulders_ok)
+
+    result = {
+        'success': True,
+        'detected': True,
+        'is_good_posture': bool(metrics['is_good_posture']),
+        'neck_angle': float(metrics['neck_angle']),
+        'back_angle': float(metrics['back_angle']),
+        'shoulder_diff': float(metrics['shoulder_diff']),
+        'neck_ok': neck_ok,
+        'back_ok': back_ok,
+        'shoulders_ok': shoulders_ok,
+        'problems': problems,
+    }
+
+    if output == OUTPUT_LANDMARKS:
+        result['landmarks'] = landmarks_to_list(points)
+    else:
+        result['image'] = image
+    return result
+
+
+def _annotate(work, points, buffers=None):
+    """Squelette dessiné sur la frame de travail RGB, en data URL JPEG"""
+    # Copie BGR (ordre attendu par imencode) dans le tampon de la session
+    with stage('draw_landmarks'):
+        image = annotation_canvas(work, buffers)
+        mp_drawing.draw_landmarks(
+            image,
+            _array_to_landmark_list(points),
+            mp_pose.POSE_CONNECTIONS,
+            mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=4),
+            mp_drawing.DrawingSpec(color=(0, 165, 255), thickness=2, circle_radius=2)
+        )
+
+    # Encoder l'image en base64 pour l'envoyer au frontend
+    with stage('imencode'):
+        _, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    with stage('base64_encode'):
+        image_base64 = base64.b64encode(buffer).decode('utf-8')
+
+    return f'data:image/jpeg;base64,{image_base64}'
+
+
+def _frame_outcome(result):
+    """Catégorie d'une frame pour le compteur posture_frames_total"""
+    if not result.get('success'):
+        return 'invalid' if result.get('error') == 'Frame invalide' else 'error'
+    if result.get('rejected'):
+        return 'rejected'
+    if result.get('fresh') is False:
+        return 'reused'
+    return 'detected' if result.get('detected') else 'not_detected'
+
+
+def _record_frame(result, seconds=None):
+    inc('posture_frames_total', labels=(('outcome', _frame_outcome(result)),))
+    if seconds is not None:
+        observe('posture_frame_seconds', seconds)
+
+
+def _not_detected_result():
+    return {
+        'success': True,
+        'detected': False,
+        'message': 'Personne non détectée'
+    }
+
+
+def _invalid_frame_result():
+    return {
+        'success': False,
+        'error': 'Frame invalide'
+    }
+
+
+def analyze_frame(frame, session_id=None, output=OUTPUT_IMAGE, use_gate=True, timestamp=None, rgb=False):
     """
     Analyse une frame vidéo et retourne les résultats
 
     Args:
-        frame: Image numpy array (BGR)
+        frame: Image numpy array (BGR, ou RGB si `rgb`)
+        session_id: Identifiant de la PostureSession (détecteur dédié)
+        output: OUTPUT_IMAGE pour renvoyer l'image annotée en base64,
+            OUTPUT_LANDMARKS pour renvoyer uniquement les 33 landmarks
+            normalisés (pas de dessin ni de ré-encodage JPEG)
+        use_gate: Passer par le filtre avant inférence de la session
+            (frames sombres/floues rejetées, scène inchangée réutilisée)
+        timestamp: Instant de capture en secondes (horloge monotone par
+            défaut) pour le filtrage temporel de la session
+        rgb: Frame déjà en RGB (frame_ingest.decode_frame) : aucune
+            conversion de couleur avant l'inférence
+
+    Le modèle, la résolution de travail et le renvoi de l'image annotée
+    suivent le palier de qualité imposé par la charge (load_control) ; le
+    palier appliqué est renvoyé dans `quality`.
 
     Returns:
-        dict avec les résultats de l'analyse
+        dict avec les résultats de l'analyse ; `fresh` indique si le
+        résultat vient d'une nouvelle inférence ou a été réutilisé
     """
+    started = time.perf_counter()
+    if timestamp is None:
+        timestamp = time.monotonic()
+
+    # Le filtre garde un état par session : jamais partagé entre clients
+    state = get_session_state(session_id)
+    quality = _session_quality(session_id, state, current_quality())
+    if output == OUTPUT_IMAGE and not quality.annotate:
+        output = OUTPUT_LANDMARKS
+
+    controller = get_load_controller()
+    controller.begin()
+    result = {}
     try:
-        pose = get_pose_detector()
+        result = _analyze_frame(frame, session_id, state, output, use_gate, timestamp, rgb, quality)
+    finally:
+        elapsed = time.perf_counter() - started
+        controller.end(elapsed if result.get('fresh') else None)
+
+    if result.get('success'):
+        result['quality'] = quality.as_dict()
+    _record_frame(result, elapsed)
+    return result
 
+
+def _analyze_frame(frame, session_id, state, output, use_gate, timestamp, rgb, quality):
+    """Filtre, inférence et construction du résultat d'une frame"""
+    try:
         # Vérifier que frame est valide
         if frame is None or frame.size == 0:
-            return {
-                'success': False,
-                'error': 'Frame invalide'
-            }
-
-        # Convertir BGR → RGB
-        image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        image.flags.writeable = False
-
-        # Détection de la posture
-        results = pose.process(image)
-
-        image.flags.writeable = True
-        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-
-        if results.pose_landmarks:
-            landmarks = results.pose_landmarks.landmark
-
-            # Analyser chaque composant
-            neck_angle, neck_ok = analyze_neck_posture(landmarks)
-            back_angle, back_ok = analyze_back_posture(landmarks)
-            shoulder_diff, shoulders_ok = analyze_shoulder_alignment(landmarks)
-
-            # Déterminer si la posture est globalement correcte
-            is_good_posture = neck_ok and back_ok and shoulders_ok
-
-            # Identifier les problèmes
-            problems = get_posture_problems(neck_ok, back_ok, shoulders_ok)
-
-            # Dessiner le squelette sur l'image
-            mp_drawing.draw_landmarks(
-                image,
-                results.pose_landmarks,
-                mp_pose.POSE_CONNECTIONS,
-                mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=4),
-                mp_drawing.DrawingSpec(color=(0, 165, 255), thickness=2, circle_radius=2)
+            return _invalid_frame_result()
+
+        with _session_buffers(state) as buffers:
+            work = _prepare_frame(frame, rgb, buffers, quality)
+
+            gate = None
+            if use_gate and state is not None and PostureConfig.FRAME_GATE_ENABLED:
+                gate = state.gate
+                with stage('gate'):
+                    decision, reason, small = gate.check(work)
+                if decision == GATE_REJECT:
+                    return rejected_result(reason)
+                if decision == GATE_REUSE:
+                    return gate.reused_result()
+
+            result = _analyze_detected_frame(
+                work, session_id, output, state, timestamp, buffers, quality.model_complexity
             )
+        result['fresh'] = True
 
-            # Encoder l'image en base64 pour l'envoyer au frontend
-            _, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 85])
-            image_base64 = base64.b64encode(buffer).decode('utf-8')
-
-            return {
-                'success': True,
-                'detected': True,
-                'is_good_posture': is_good_posture,
-                'neck_angle': float(neck_angle),
-                'back_angle': float(back_angle),
-                'shoulder_diff': float(shoulder_diff),
-                'neck_ok': neck_ok,
-                'back_ok': back_ok,
-                'shoulders_ok': shoulders_ok,
-                'problems': problems,
-                'image': f'data:image/jpeg;base64,{image_base64}',
-            }
-        else:
-            return {
-                'success': True,
-                'detected': False,
-                'message': 'Personne non détectée'
-            }
+        if gate is not None:
+            gate.store(small, result)
+        return result
 
     except Exception as e:
-        print(f"Erreur dans analyze_frame: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Erreur dans analyze_frame")
         return {
             'success': False,
             'error': str(e)
         }
 
 
+def _analyze_detected_frame(work, session_id, output, state, timestamp, buffers, model_complexity):
+    """Inférence et calcul des métriques d'une frame de travail valide"""
+    points = _detect_pose(work, session_id, state, model_complexity)
+    if points is None:
+        return _not_detected_result()
+
+    temporal = _temporal_filter(state)
+    if temporal is not None:
+        points = temporal.smooth(points, timestamp)
+
+    # Analyser tous les composants en une passe vectorisée
+    with stage('geometry'):
+        metrics = compute_posture_metrics(points)
+
+    if temporal is not None:
+        metrics = temporal.decide(metrics)
+
+    image = _annotate(work, points, buffers) if output == OUTPUT_IMAGE else None
+    return _build_result(points, metrics, output, image)
+
+
+def _temporal_filter(state):
+    """Filtre temporel de la session, ou None (pas de session, filtrage désactivé)"""
+    if state is None or not PostureConfig.TEMPORAL_FILTER_ENABLED:
+        return None
+    return state.temporal
+
+
+def analyze_frames(frames, session_id=None, output=OUTPUT_IMAGE, timestamps=None, rgb=False):
+    """
+    Analyse un lot de frames d'une même session
+
+    Les frames sont passées au détecteur dans l'ordre (suivi MediaPipe),
+    puis les métriques de toutes les frames détectées sont calculées en un
+    seul appel vectorisé.
+
+    Args:
+        frames: Liste d'images numpy array (BGR, ou RGB si `rgb`), dans
+            l'ordre de capture
+        session_id: Identifiant de la PostureSession (détecteur dédié)
+        output: Mode de réponse de chaque frame (voir analyze_frame)
+        timestamps: Instants de capture en secondes (même origine pour tout
+            le lot), la dernière frame étant considérée comme actuelle ; par
+            défaut, frames espacées de 1 / VIDEO_FPS
+        rgb: Frames déjà en RGB (frame_ingest.decode_frame)
+
+    Returns:
+        dict avec les résultats par frame, un résumé agrégé et le palier
+        de qualité appliqué au lot
+    """
+    results = [None] * len(frames)
+    detections = []
+    state = get_session_state(session_id)
+    temporal = _temporal_filter(state)
+
+    quality = _session_quality(session_id, state, current_quality())
+    if output == OUTPUT_IMAGE and not quality.annotate:
+        output = OUTPUT_LANDMARKS
+    controller = get_load_controller()
+
+    # Ramener les horodatages du client sur l'horloge monotone du serveur
+    now = time.monotonic()
+    if timestamps is None:
+        # Sans horodatage : frames supposées capturées à VIDEO_FPS, la dernière maintenant
+        count = len(frames)
+        timestamps = [now - (count - 1 - index) / PostureConfig.VIDEO_FPS for index in range(count)]
+    else:
+        latest = max(timestamps, default=0.0)
+        timestamps = [now - (latest - timestamp) for timestamp in timestamps]
+
+    with _session_buffers(state) as buffers:
+        for index, frame in enumerate(frames):
+            if frame is None or frame.size == 0:
+                results[index] = _invalid_frame_result()
+                continue
+            started = time.perf_counter()
+            controller.begin()
+            try:
+                # Les tampons sont réutilisés à la frame suivante : l'image
+                # annotée est encodée tout de suite
+                work = _prepare_frame(frame, rgb, buffers, quality)
+                points = _detect_pose(work, session_id, state, quality.model_complexity)
+                if points is not None:
+                    if temporal is not None:
+                        points = temporal.smooth(points, timestamps[index])
+                    image = _annotate(work, points, buffers) if output == OUTPUT_IMAGE else None
+            except Exception as e:
+                logger.exception("Erreur dans analyze_frames")
+                results[index] = {'success': False, 'error': str(e)}
+                continue
+            finally:
+                controller.end(time.perf_counter() - started)
+
+            if points is None:
+                results[index] = _not_detected_result()
+            else:
+                detections.append((index, points, image))
+
+    metrics = None
+    if detections:
+        metrics = compute_posture_metrics(np.stack([points for _, points, _ in detections]))
+        for row, (index, points, image) in enumerate(detections):
+            frame_metrics = {key: values[row] for key, values in metrics.items()}
+            if temporal is not None:
+                frame_metrics = temporal.decide(frame_metrics)
+                for key in ('neck_ok', 'back_ok', 'shoulders_ok', 'is_good_posture'):
+                    metrics[key][row] = frame_metrics[key]
+            results[index] = _build_result(points, frame_metrics, output, image)
+
+    for result in results:
+        _record_frame(result)
+
+    return {
+        'success': True,
+        'results': results,
+        'summary': summarize_metrics(metrics, len(frames)),
+        'quality': quality.as_dict(),
+    }
+
+
+def summarize_metrics(metrics, frame_count):
+    """Résumé agrégé des métriques d'un lot de frames détectées"""
+    detected = 0 if metrics is None else len(metrics['is_good_posture'])
+    summary = {
+        'frames': frame_count,
+        'detected': detected,
+        'good_posture_frames': 0,
+        'bad_posture_frames': 0,
+        'good_posture_ratio': None,
+        'avg_neck_angle': None,
+        'avg_back_angle': None,
+        'avg_shoulder_diff': None,
+        'problems': {},
+    }
+    if not detected:
+        return summary
+
+    good = int(np.count_nonzero(metrics['is_good_posture']))
+    summary.update({
+        'good_posture_frames': good,
+        'bad_posture_frames': detected - good,
+        'good_posture_ratio': good / detected,
+        'avg_neck_angle': float(metrics['neck_angle'].mean()),
+        'avg_back_angle': float(metrics['back_angle'].mean()),
+        'avg_shoulder_diff': float(metrics['shoulder_diff'].mean()),
+    })
+
+    # Nombre de frames par problème détecté
+    labels = get_posture_problems(False, False, False)
+    for label, key in zip(labels, ('neck_ok', 'back_ok', 'shoulders_ok')):
+        count = detected - int(np.count_nonzero(metrics[key]))
+        if count:
+            summary['problems'][label] = count
+
+    return summary
+
+
 class PostureAnalyzerSession:
     """
     Classe pour gérer une session d'analyse complète
@@ -209,24 +621,31 @@ class PostureAnalyzerSession:
 
     def __init__(self):
         self.bad_posture_start_time = None
+        self.last_alert_time = None
         self.total_bad_posture_time = 0
         self.alert_count = 0
         self.posture_history = deque(maxlen=100)
-        self.neck_angles = []
-        self.back_angles = []
-        self.shoulder_diffs = []
 
-    def update(self, is_good_posture, neck_angle, back_angle, shoulder_diff):
-        """Met à jour l'état de la session"""
-        import time
+        # Statistiques en flux : mémoire constante quelle que soit la durée
+        self.neck_stats = RunningStats()
+        self.back_stats = RunningStats()
+        self.shoulder_stats = RunningStats()
 
+    def update(self, is_good_posture, neck_angle, back_angle, shoulder_diff, current_time=None):
+        """
+        Met à jour l'état de la session
+
+        `current_time` (secondes) permet de rejouer une vidéo enregistrée
+        avec son propre horodatage ; par défaut l'heure courante est utilisée.
+        """
         # Ajouter à l'historique
         self.posture_history.append(1 if is_good_posture else 0)
-        self.neck_angles.append(neck_angle)
-        self.back_angles.append(back_angle)
-        self.shoulder_diffs.append(shoulder_diff)
+        self.neck_stats.add(neck_angle)
+        self.back_stats.add(back_angle)
+        self.shoulder_stats.add(shoulder_diff)
 
-        current_time = time.time()
+        if current_time is None:
+            current_time = time.time()
 
         if not is_good_posture:
             if self.bad_posture_start_time is None:
@@ -234,30 +653,45 @@ class PostureAnalyzerSession:
 
             bad_posture_duration = current_time - self.bad_posture_start_time
 
-            # Déclencher alerte après 10 secondes
-            if bad_posture_duration >= 10:
+            # Une alerte après BAD_POSTURE_ALERT_TIME secondes, puis une par
+            # BAD_POSTURE_ALERT_TIME tant que la mauvaise posture continue
+            # (comme l'interface web), et non une par frame
+            alert_time = PostureConfig.BAD_POSTURE_ALERT_TIME
+            if bad_posture_duration >= alert_time and (
+                self.last_alert_time is None or current_time - self.last_alert_time >= alert_time
+            ):
                 self.alert_count += 1
+                self.last_alert_time = current_time
                 return True, bad_posture_duration
         else:
-            if self.bad_posture_start_time is not None:
-                self.total_bad_posture_time += current_time - self.bad_posture_start_time
-                self.bad_posture_start_time = None
+            self.flush(current_time)
 
         return False, 0
 
+    def flush(self, current_time=None):
+        """Clôt l'épisode de mauvaise posture en cours (fin de session)"""
+        if current_time is None:
+            current_time = time.time()
+
+        if self.bad_posture_start_time is not None:
+            self.total_bad_posture_time += current_time - self.bad_posture_start_time
+            self.bad_posture_start_time = None
+        self.last_alert_time = None
+
     def get_statistics(self, total_time):
         """Calcule les statistiques de la session"""
         bad_posture_percentage = (self.total_bad_posture_time / total_time * 100) if total_time > 0 else 0
 
-        avg_neck = sum(self.neck_angles) / len(self.neck_angles) if self.neck_angles else 0
-        avg_back = sum(self.back_angles) / len(self.back_angles) if self.back_angles else 0
-        avg_shoulder = sum(self.shoulder_diffs) / len(self.shoulder_diffs) if self.shoulder_diffs else 0
-
         return {
             'bad_posture_time': self.total_bad_posture_time,
             'bad_posture_percentage': bad_posture_percentage,
             'alert_count': self.alert_count,
-            'avg_neck_angle': avg_neck,
-            'avg_back_angle': avg_back,
-            'avg_shoulder_diff': avg_shoulder,
-        }
\ No newline at end of file
+            'avg_neck_angle': self.neck_stats.mean,
+            'avg_back_angle': self.back_stats.mean,
+            'avg_shoulder_diff': self.shoulder_stats.mean,
+            'metrics_summary': {
+                'neck_angle': self.neck_stats.summary(),
+                'back_angle': self.back_stats.summary(),
+                'shoulder_diff': self.shoulder_stats.summary(),
+            },
+        }
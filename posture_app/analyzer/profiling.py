@@ -0,0 +1,43 @@
+# posture_app/analyzer/profiling.py
+
+"""
+Mesure du temps passé dans chaque étape du pipeline d'analyse.
+
+Les étapes sont délimitées par `stage(nom)` dans le code du pipeline. Leur
+durée alimente toujours l'histogramme posture_frame_stage_seconds (voir
+telemetry) et, dans un bloc `record_stages()`, le détail de la frame en
+cours (benchmarks).
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from .telemetry import observe
+
+_recorder = ContextVar('stage_recorder', default=None)
+
+
+@contextmanager
+def stage(name):
+    """Mesure la durée du bloc comme étape `name` du pipeline"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        observe('posture_frame_stage_seconds', elapsed, (('stage', name),))
+        timings = _recorder.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+
+@contextmanager
+def record_stages():
+    """Mesure les étapes exécutées dans le bloc ; produit le dict étape -> secondes"""
+    timings = {}
+    token = _recorder.set(timings)
+    try:
+        yield timings
+    finally:
+        _recorder.reset(token)
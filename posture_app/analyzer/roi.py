@@ -0,0 +1,71 @@
+# posture_app/analyzer/roi.py
+
+import numpy as np
+
+from .config import PostureConfig
+
+
+class RoiTracker:
+    """
+    Région d'intérêt autour de la personne, déduite des landmarks précédents
+
+    La région (en coordonnées normalisées) n'est recalculée que lorsque la
+    personne s'approche de ses bords ou qu'elle devient trop grande : elle
+    reste stable d'une frame à l'autre, ce qui préserve le suivi MediaPipe.
+    """
+
+    def __init__(self):
+        self.box = None
+
+    def reset(self):
+        """Suivi perdu : la prochaine frame sera analysée en entier"""
+        self.box = None
+
+    def region(self, width, height):
+        """Région à analyser en pixels (x0, y0, x1, y1), ou None pour la frame entière"""
+        if self.box is None:
+            return None
+        x0, y0, x1, y1 = self.box
+        return (int(x0 * width), int(y0 * height),
+                int(np.ceil(x1 * width)), int(np.ceil(y1 * height)))
+
+    def update(self, points):
+        """Met à jour la région à partir des landmarks (33, 4) de la frame entière"""
+        visible = points[points[:, 3] >= PostureConfig.ROI_MIN_VISIBILITY]
+        if len(visible) < PostureConfig.ROI_MIN_LANDMARKS:
+            self.reset()
+            return
+
+        x0, y0 = visible[:, 0].min(), visible[:, 1].min()
+        x1, y1 = visible[:, 0].max(), visible[:, 1].max()
+
+        # La personne est encore bien à l'intérieur de la région actuelle
+        if self.box is not None:
+            bx0, by0, bx1, by1 = self.box
+            inner = PostureConfig.ROI_MARGIN / 2
+            inside = (x0 - bx0 > inner * (bx1 - bx0) and bx1 - x1 > inner * (bx1 - bx0) and
+                      y0 - by0 > inner * (by1 - by0) and by1 - y1 > inner * (by1 - by0))
+            if inside and (x1 - x0) * (y1 - y0) > 0.25 * (bx1 - bx0) * (by1 - by0):
+                return
+
+        margin_x = (x1 - x0) * PostureConfig.ROI_MARGIN
+        margin_y = (y1 - y0) * PostureConfig.ROI_MARGIN
+        box = (max(0.0, x0 - margin_x), max(0.0, y0 - margin_y),
+               min(1.0, x1 + margin_x), min(1.0, y1 + margin_y))
+
+        # Recadrer n'apporte rien si la personne occupe presque toute l'image
+        area = (box[2] - box[0]) * (box[3] - box[1])
+        self.box = box if area < PostureConfig.ROI_MAX_AREA else None
+
+
+def map_to_frame(points, region, width, height):
+    """Ramène des landmarks normalisés dans la région vers la frame entière"""
+    x0, y0, x1, y1 = region
+    scale_x = (x1 - x0) / width
+    scale_y = (y1 - y0) / height
+
+    mapped = points.copy()
+    mapped[:, 0] = x0 / width + points[:, 0] * scale_x
+    mapped[:, 1] = y0 / height + points[:, 1] * scale_y
+    mapped[:, 2] = points[:, 2] * scale_x  # z suit l'échelle de la largeur
+    return mapped
@@ -0,0 +1,227 @@
+# posture_app/analyzer/session_pool.py
+
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Intervalle entre deux balayages des ressources inactives (s)
+SWEEP_INTERVAL = 30
+
+
+class _PoolEntry:
+    """Entrée du pool : la ressource, son verrou et sa date de dernière utilisation"""
+
+    __slots__ = ('resource', 'lock', 'last_used', 'leases', 'evicted')
+
+    def __init__(self, resource):
+        self.resource = resource
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        self.leases = 0
+        self.evicted = False
+
+
+class SessionPool:
+    """
+    Pool borné de ressources indexées par identifiant de session.
+
+    Chaque session obtient sa propre ressource (créée à la demande par
+    `factory`). Les ressources les moins récemment utilisées sont évincées
+    lorsque le pool dépasse `max_size`, ainsi que celles inactives depuis
+    plus de `idle_timeout` secondes : un thread de fond balaie les pools
+    toutes les SWEEP_INTERVAL secondes, même sans nouvelle session.
+    `on_evict` est appelé pour libérer une ressource évincée, une fois
+    qu'elle n'est plus utilisée. `get` et `lease` acceptent une autre
+    fabrique pour une ressource à créer.
+    """
+
+    def __init__(self, factory, max_size=32, idle_timeout=300, on_evict=None):
+        self.factory = factory
+        self.max_size = max(1, int(max_size))
+        self.idle_timeout = idle_timeout
+        self.on_evict = on_evict
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if idle_timeout:
+            _watch(self)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key, factory=None):
+        """Retourne la ressource de la session (sans verrouillage exclusif)"""
+        entry = self._acquire(key, factory)
+        with self._lock:
+            entry.leases -= 1
+        return entry.resource
+
+    @contextmanager
+    def lease(self, key, factory=None):
+        """Emprunte la ressource de la session avec un accès exclusif"""
+        entry = self._acquire(key, factory)
+        try:
+            with entry.lock:
+                yield entry.resource
+        finally:
+            with self._lock:
+                entry.leases -= 1
+                entry.last_used = time.monotonic()
+                release = entry.evicted and entry.leases == 0
+            if release:
+                self._release(entry)
+
+    def pop(self, key, default=None):
+        """Retire la ressource d'une session et la rend à l'appelant (sans `on_evict`)"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return default
+            entry.evicted = True
+        # Attendre la fin d'un éventuel emprunt en cours avant de la rendre
+        with entry.lock:
+            return entry.resource
+
+    def discard(self, key):
+        """Retire la ressource d'une session (fin de session)"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            release = self._mark_evicted(entry)
+        if release:
+            self._release(entry)
+
+    def clear(self):
+        """Vide le pool et libère toutes les ressources"""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+            released = [entry for entry in entries if self._mark_evicted(entry)]
+        for entry in released:
+            self._release(entry)
+
+    def evict_idle(self):
+        """Évince les ressources inactives depuis plus de `idle_timeout`"""
+        with self._lock:
+            released = self._evict_idle_locked(time.monotonic())
+        for entry in released:
+            self._release(entry)
+        return len(released)
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries.keys())
+
+    # ------------------------------------------------------------------
+
+    def _acquire(self, key, factory=None):
+        """Récupère ou crée l'entrée de `key` et y pose un emprunt"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._touch(key, entry)
+                return entry
+
+        # La création (chargement d'un modèle) est lente : on la fait
+        # hors du verrou pour ne pas bloquer les autres sessions.
+        resource = (factory or self.factory)()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            duplicate = entry is not None
+            released = []
+            if entry is None:
+                released = self._evict_idle_locked(time.monotonic())
+                while len(self._entries) >= self.max_size:
+                    _, oldest = self._entries.popitem(last=False)
+                    if self._mark_evicted(oldest):
+                        released.append(oldest)
+                entry = _PoolEntry(resource)
+                self._entries[key] = entry
+            self._touch(key, entry)
+
+        if duplicate:
+            released.append(_PoolEntry(resource))
+        for old in released:
+            self._release(old)
+        return entry
+
+    def _touch(self, key, entry):
+        self._entries.move_to_end(key)
+        entry.last_used = time.monotonic()
+        entry.leases += 1
+
+    def _evict_idle_locked(self, now):
+        released = []
+        if not self.idle_timeout:
+            return released
+
+        for key in list(self._entries.keys()):
+            entry = self._entries[key]
+            if entry.leases == 0 and now - entry.last_used > self.idle_timeout:
+                del self._entries[key]
+                if self._mark_evicted(entry):
+                    released.append(entry)
+        return released
+
+    @staticmethod
+    def _mark_evicted(entry):
+        """Marque l'entrée comme évincée ; True si elle peut être libérée"""
+        if entry is None:
+            return False
+        entry.evicted = True
+        return entry.leases == 0
+
+    def _release(self, entry):
+        if self.on_evict is None:
+            return
+        try:
+            self.on_evict(entry.resource)
+        except Exception:
+            logger.exception("Erreur libération ressource de session")
+
+
+_pools = weakref.WeakSet()
+_sweeper = None
+_sweeper_lock = threading.Lock()
+
+
+def _watch(pool):
+    """Inscrit un pool au balayage périodique (thread démarré au premier pool)"""
+    global _sweeper
+    with _sweeper_lock:
+        _pools.add(pool)
+        if _sweeper is None:
+            _sweeper = threading.Thread(target=_sweep_forever, name='session-pool-sweeper', daemon=True)
+            _sweeper.start()
+
+
+def _sweep_forever():
+    while True:
+        time.sleep(SWEEP_INTERVAL)
+        for pool in list(_pools):
+            try:
+                pool.evict_idle()
+            except Exception:
+                logger.exception("Erreur lors du balayage d'un pool de sessions")
+
+
+def _restart_sweeper():
+    # Le thread de balayage ne survit pas à un fork (serveurs préforkés)
+    global _sweeper, _sweeper_lock
+    _sweeper, _sweeper_lock = None, threading.Lock()
+    for pool in list(_pools):
+        _watch(pool)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_sweeper)
@@ -0,0 +1,172 @@
+# posture_app/analyzer/streaming_stats.py
+
+"""
+Statistiques en flux à mémoire constante.
+
+Une session de 8 heures à 5 frames/s produit plus de 140 000 mesures par
+métrique : au lieu de les conserver, chaque métrique est résumée par une
+moyenne/variance glissante (Welford), son minimum/maximum et des
+estimateurs de quantiles P² (Jain & Chlamtac), qui n'utilisent que cinq
+marqueurs chacun quelle que soit la durée de la session. Les premières
+valeurs sont gardées telles quelles : les quantiles d'une session courte
+sont exacts, et les marqueurs P² partent de leurs rangs dans cet échantillon.
+"""
+
+import math
+
+# Quantiles suivis pour chaque métrique
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+# Valeurs conservées (quantiles exacts) avant de passer aux marqueurs P²
+EXACT_SAMPLES = 20
+
+
+class P2Quantile:
+    """Estimateur P² d'un quantile (mémoire constante, O(1) par valeur)"""
+
+    __slots__ = ('p', 'count', 'samples', 'heights', 'positions', 'desired', 'increments')
+
+    def __init__(self, p):
+        self.p = p
+        self.count = 0
+        self.samples = []   # Premières valeurs (None une fois les marqueurs placés)
+        self.heights = None
+        self.positions = None
+        self.desired = None
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x):
+        self.count += 1
+
+        if self.samples is not None:
+            self.samples.append(x)
+            if self.count > EXACT_SAMPLES:
+                self._place_markers()
+            return
+
+        heights = self.heights
+        if x < heights[0]:
+            heights[0] = x
+            k = 0
+        elif x >= heights[4]:
+            heights[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= heights[k + 1]:
+                k += 1
+
+        positions = self.positions
+        for i in range(k + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # Ajuster les marqueurs intermédiaires
+        for i in range(1, 4):
+            d = self.desired[i] - positions[i]
+            if (d >= 1 and positions[i + 1] - positions[i] > 1) or \
+                    (d <= -1 and positions[i - 1] - positions[i] < -1):
+                d = 1 if d > 0 else -1
+                candidate = self._parabolic(i, d)
+                if not heights[i - 1] < candidate < heights[i + 1]:
+                    candidate = heights[i] + d * (heights[i + d] - heights[i]) / (positions[i + d] - positions[i])
+                heights[i] = candidate
+                positions[i] += d
+
+    def _place_markers(self):
+        """Marqueurs initiaux aux rangs du quantile dans les premières valeurs triées"""
+        values = sorted(self.samples)
+        last = len(values) - 1
+        self.desired = [last * increment for increment in self.increments]
+        positions = [0] * 5
+        positions[4] = last
+        for i in range(1, 4):
+            # Rangs strictement croissants, même pour un quantile extrême
+            positions[i] = min(max(round(self.desired[i]), positions[i - 1] + 1), last - (4 - i))
+        self.positions = positions
+        self.heights = [values[position] for position in positions]
+        self.samples = None
+
+    def _parabolic(self, i, d):
+        q, n = self.heights, self.positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+            (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    @property
+    def value(self):
+        if self.count == 0:
+            return None
+        if self.samples is not None:
+            # Peu de valeurs : quantile exact par interpolation linéaire
+            values = sorted(self.samples)
+            rank = self.p * (len(values) - 1)
+            low = int(math.floor(rank))
+            high = min(low + 1, len(values) - 1)
+            return values[low] + (values[high] - values[low]) * (rank - low)
+
+        # Marqueurs interpolés au rang visé : le marqueur central n'atteint
+        # ce rang qu'après quelques ajustements (quantiles extrêmes)
+        rank = min(max(self.desired[2], 0), self.positions[4])
+        i = 0
+        while i < 3 and rank > self.positions[i + 1]:
+            i += 1
+        low, high = self.positions[i], self.positions[i + 1]
+        return self.heights[i] + (self.heights[i + 1] - self.heights[i]) * (rank - low) / (high - low)
+
+
+class RunningStats:
+    """Moyenne, variance, min/max et quantiles d'une métrique, en mémoire constante"""
+
+    __slots__ = ('count', 'mean', '_m2', 'min', 'max', 'quantiles')
+
+    def __init__(self, quantiles=DEFAULT_QUANTILES):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = None
+        self.max = None
+        self.quantiles = {p: P2Quantile(p) for p in quantiles}
+
+    def add(self, x):
+        x = float(x)
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+
+        if self.min is None or x < self.min:
+            self.min = x
+        if self.max is None or x > self.max:
+            self.max = x
+
+        for estimator in self.quantiles.values():
+            estimator.add(x)
+
+    @property
+    def variance(self):
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def quantile(self, p):
+        return self.quantiles[p].value
+
+    def summary(self):
+        """Résumé sérialisable (JSON) de la métrique"""
+        if not self.count:
+            return {'count': 0}
+        summary = {
+            'count': self.count,
+            'mean': self.mean,
+            'std': self.std,
+            'min': self.min,
+            'max': self.max,
+        }
+        for p, estimator in self.quantiles.items():
+            summary[f'p{round(p * 100):d}'] = estimator.value
+        return summary
@@ -0,0 +1,170 @@
+# posture_app/analyzer/telemetry.py
+
+"""
+Compteurs et histogrammes toujours actifs, exposés au format Prometheus.
+
+Chaque thread écrit dans ses propres tables (aucun verrou à l'écriture) ;
+`render()` additionne les tables de tous les threads au moment de la
+collecte. La table d'un thread terminé est reportée dans une table commune
+(serveurs à un thread par requête, pools de threads ASGI) : leur nombre
+reste celui des threads vivants. Les jauges dont la valeur se lit ailleurs (sessions en cours,
+détecteurs) sont des fonctions appelées à la collecte.
+"""
+
+import bisect
+import threading
+import weakref
+
+# Bornes des histogrammes de durée (secondes)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_HELP = {
+    'posture_frame_stage_seconds': ('histogram', "Durée de chaque étape du pipeline d'analyse"),
+    'posture_frame_seconds': ('histogram', "Durée totale de l'analyse d'une frame"),
+    'posture_frames_total': ('counter', 'Frames traitées, par résultat'),
+    'posture_http_requests_total': ('counter', 'Requêtes HTTP, par vue et code de statut'),
+    'posture_http_request_seconds': ('histogram', 'Durée des requêtes HTTP, par vue'),
+    'posture_http_requests_in_flight': ('gauge', 'Requêtes HTTP en cours de traitement'),
+    'posture_db_queries_total': ('counter', 'Requêtes SQL exécutées, par vue'),
+    'posture_db_seconds_total': ('counter', 'Temps passé en base de données, par vue'),
+    'posture_quality_changes_total': ('counter', 'Changements de palier de qualité, par sens'),
+    'posture_frames_throttled_total': ('counter', 'Frames refusées (429) car la cadence de la session était dépassée'),
+    'posture_frames_shed_total': ('counter', "Frames refusées (503) car la file d'analyse était pleine"),
+    'posture_inference_worker_restarts_total': ('counter', "Workers d'inférence arrêtés puis relancés"),
+}
+
+_shards = []
+_shards_lock = threading.Lock()  # Création et fin d'un thread, collecte
+_local = threading.local()
+_gauges = {}
+
+
+class _Shard:
+    __slots__ = ('values', 'histograms')
+
+    def __init__(self):
+        self.values = {}       # (nom, labels) -> valeur (compteurs et jauges additives)
+        self.histograms = {}   # (nom, labels) -> [compte par borne..., +Inf, somme]
+
+
+class _ThreadToken:
+    """Objet propre au thread, libéré avec ses données locales à la fin du thread"""
+    __slots__ = ('__weakref__',)
+
+
+# Totaux des threads terminés
+_retired = _Shard()
+
+
+def _shard():
+    shard = getattr(_local, 'shard', None)
+    if shard is None:
+        shard = _Shard()
+        _local.token = token = _ThreadToken()
+        weakref.finalize(token, _retire, shard)
+        with _shards_lock:
+            _shards.append(shard)
+        _local.shard = shard
+    return shard
+
+
+def _retire(shard):
+    """Reporte la table d'un thread terminé dans `_retired`"""
+    with _shards_lock:
+        try:
+            _shards.remove(shard)
+        except ValueError:
+            return
+        _add(_retired, shard)
+
+
+def _add(target, shard):
+    # dict.copy() est atomique sous le GIL : pas de verrou côté écriture
+    values = target.values
+    for key, value in shard.values.copy().items():
+        values[key] = values.get(key, 0) + value
+    histograms = target.histograms
+    for key, buckets in shard.histograms.copy().items():
+        merged = histograms.setdefault(key, [0] * len(buckets))
+        for index, count in enumerate(list(buckets)):
+            merged[index] += count
+
+
+def inc(name, value=1, labels=()):
+    """Incrémente un compteur (ou une jauge additive si `value` est négatif)"""
+    values = _shard().values
+    key = (name, labels)
+    values[key] = values.get(key, 0) + value
+
+
+def observe(name, seconds, labels=()):
+    """Ajoute une durée à un histogramme"""
+    histograms = _shard().histograms
+    key = (name, labels)
+    buckets = histograms.get(key)
+    if buckets is None:
+        buckets = histograms[key] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+    buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+    buckets[-1] += seconds
+
+
+def register_gauge(name, help_text, read):
+    """Jauge lue à la collecte : `read()` retourne un nombre ou {labels: valeur}"""
+    _gauges[name] = (help_text, read)
+
+
+def _labels_text(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+
+def _merged():
+    total = _Shard()
+    # Sous verrou : une table en cours de report n'est comptée qu'une fois
+    with _shards_lock:
+        _add(total, _retired)
+        for shard in _shards:
+            _add(total, shard)
+    return total.values, total.histograms
+
+
+def render():
+    """Toutes les métriques au format texte Prometheus (version 0.0.4)"""
+    values, histograms = _merged()
+    lines = []
+
+    names = sorted({name for name, _ in values} | {name for name, _ in histograms})
+    for name in names:
+        kind, help_text = _HELP.get(name, ('untyped', name))
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+
+        for (metric, labels), value in sorted(values.items()):
+            if metric == name:
+                lines.append(f'{name}{_labels_text(labels)} {value}')
+
+        for (metric, labels), buckets in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), buckets[:-1]):
+                cumulative += count
+                lines.append(f'{name}_bucket{_labels_text(labels + (("le", bound),))} {cumulative}')
+            lines.append(f'{name}_sum{_labels_text(labels)} {buckets[-1]}')
+            lines.append(f'{name}_count{_labels_text(labels)} {cumulative}')
+
+    for name, (help_text, read) in sorted(_gauges.items()):
+        try:
+            value = read()
+        except Exception:
+            continue
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} gauge')
+        if isinstance(value, dict):
+            for labels, item in sorted(value.items()):
+                lines.append(f'{name}{_labels_text(labels)} {item}')
+        else:
+            lines.append(f'{name} {value}')
+
+    return '\n'.join(lines) + '\n'
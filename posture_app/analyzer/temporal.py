@@ -0,0 +1,156 @@
+# posture_app/analyzer/temporal.py
+
+"""
+Filtrage temporel des landmarks et stabilisation des verdicts de posture.
+
+Les landmarks d'une frame isolée tremblent de quelques pixels : près d'un
+seuil, neck_ok / back_ok / shoulders_ok basculeraient d'une frame à l'autre.
+Chaque session lisse ses landmarks avec un filtre One-Euro (Casiez et al.),
+qui tient compte de l'intervalle réel entre frames, puis applique une
+hystérésis autour de chaque seuil : un critère ne change d'état que si la
+mesure franchit le seuil d'une marge. Les verdicts restent stables à 1-2
+frames/s.
+"""
+
+import math
+
+import numpy as np
+
+from .config import PostureConfig
+
+
+def _smoothing_factor(cutoff, dt):
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter:
+    """Filtre One-Euro appliqué élément par élément à un tableau de valeurs"""
+
+    def __init__(self, min_cutoff, beta, d_cutoff=1.0, min_dt=1e-3):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.min_dt = min_dt  # Intervalle appliqué aux mesures pas plus récentes que l'estimation
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.derivative = None
+        self.timestamp = None
+
+    def __call__(self, value, timestamp):
+        value = np.asarray(value, dtype=np.float64)
+        if self.value is None:
+            self.value = value
+            self.derivative = np.zeros_like(value)
+            self.timestamp = timestamp
+            return value
+
+        dt = max(timestamp - self.timestamp, self.min_dt)
+        self.timestamp = max(timestamp, self.timestamp)
+
+        # Vitesse lissée : plus la mesure bouge vite, moins on filtre (pas de retard)
+        a_d = _smoothing_factor(self.d_cutoff, dt)
+        self.derivative = a_d * (value - self.value) / dt + (1 - a_d) * self.derivative
+
+        alpha = _smoothing_factor(self.min_cutoff + self.beta * np.abs(self.derivative), dt)
+        self.value = alpha * value + (1 - alpha) * self.value
+        return self.value
+
+
+class PostureHysteresis:
+    """Verdicts par critère qui ne basculent qu'au-delà d'une marge autour du seuil"""
+
+    def __init__(self):
+        self.state = {}
+
+    def reset(self):
+        self.state = {}
+
+    def _decide(self, key, ok_now, ok_with_margin, ok_against_margin):
+        previous = self.state.get(key)
+        if previous is None:
+            decision = ok_now
+        elif previous:
+            # Reste correct tant que la mesure ne dépasse pas le seuil + marge
+            decision = ok_with_margin
+        else:
+            # Ne redevient correct qu'une fois le seuil franchi de la marge
+            decision = ok_against_margin
+        self.state[key] = decision
+        return decision
+
+    def update(self, neck_angle, back_angle, shoulder_diff):
+        """Returns: (neck_ok, back_ok, shoulders_ok)"""
+        neck_max = PostureConfig.NECK_ANGLE_MAX
+        back_min = PostureConfig.BACK_ANGLE_MIN
+        shoulder_max = PostureConfig.SHOULDER_DIFF_MAX
+        neck_margin = PostureConfig.HYSTERESIS_NECK_ANGLE
+        back_margin = PostureConfig.HYSTERESIS_BACK_ANGLE
+        shoulder_margin = PostureConfig.HYSTERESIS_SHOULDER_DIFF
+
+        neck_ok = self._decide(
+            'neck', neck_angle < neck_max,
+            neck_angle < neck_max + neck_margin, neck_angle < neck_max - neck_margin
+        )
+        back_ok = self._decide(
+            'back', back_angle >= back_min,
+            back_angle >= back_min - back_margin, back_angle >= back_min + back_margin
+        )
+        shoulders_ok = self._decide(
+            'shoulders', shoulder_diff <= shoulder_max,
+            shoulder_diff <= shoulder_max + shoulder_margin,
+            shoulder_diff <= shoulder_max - shoulder_margin
+        )
+        return neck_ok, back_ok, shoulders_ok
+
+
+class TemporalPostureFilter:
+    """Lissage des landmarks et hystérésis des verdicts d'une session"""
+
+    def __init__(self):
+        self.landmarks = OneEuroFilter(
+            PostureConfig.ONE_EURO_MIN_CUTOFF,
+            PostureConfig.ONE_EURO_BETA,
+            PostureConfig.ONE_EURO_D_CUTOFF,
+            min_dt=1.0 / PostureConfig.VIDEO_FPS
+        )
+        self.hysteresis = PostureHysteresis()
+        self.last_timestamp = None
+
+    def reset(self):
+        self.landmarks.reset()
+        self.hysteresis.reset()
+        self.last_timestamp = None
+
+    def smooth(self, points, timestamp):
+        """
+        Lisse x, y, z d'un tableau (33, 4) ; la visibilité reste celle de la frame
+
+        Le temps de la session est monotone : une frame pas plus récente que
+        la précédente (lot intercalé avec le direct, horodatages identiques)
+        compte comme arrivée une frame (1 / VIDEO_FPS) plus tard.
+        """
+        if self.last_timestamp is not None:
+            timestamp = max(timestamp, self.last_timestamp)
+            # Personne absente trop longtemps : repartir de la nouvelle mesure
+            if timestamp - self.last_timestamp > PostureConfig.TEMPORAL_FILTER_RESET_GAP:
+                self.reset()
+        self.last_timestamp = timestamp
+
+        smoothed = points.astype(np.float64, copy=True)
+        smoothed[:, :3] = self.landmarks(points[:, :3], timestamp)
+        return smoothed
+
+    def decide(self, metrics):
+        """Remplace les verdicts d'une frame par leur version avec hystérésis"""
+        neck_ok, back_ok, shoulders_ok = self.hysteresis.update(
+            float(metrics['neck_angle']), float(metrics['back_angle']), float(metrics['shoulder_diff'])
+        )
+        metrics = dict(metrics)
+        metrics['neck_ok'] = neck_ok
+        metrics['back_ok'] = back_ok
+        metrics['shoulders_ok'] = shoulders_ok
+        metrics['is_good_posture'] = neck_ok and back_ok and shoulders_ok
+        return metrics
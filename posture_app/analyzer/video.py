@@ -0,0 +1,60 @@
+# posture_app/analyzer/video.py
+
+import cv2
+
+
+def iter_video_frames(path, target_fps=None, frame_step=1):
+    """
+    Parcourt un fichier vidéo frame par frame (générateur, mémoire bornée)
+
+    Les frames non retenues sont seulement avancées (`grab`) sans être
+    décodées. Avec `target_fps`, les frames sont échantillonnées sur leur
+    horodatage vidéo ; sinon une frame sur `frame_step` est retenue.
+
+    Yields:
+        (index, timestamp en secondes, frame BGR)
+    """
+    capture = cv2.VideoCapture(str(path))
+    if not capture.isOpened():
+        raise IOError(f"Impossible d'ouvrir la vidéo: {path}")
+
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+        frame_step = max(1, int(frame_step))
+        sample_interval = 1.0 / target_fps if target_fps else None
+        next_sample = 0.0
+        index = -1
+
+        while True:
+            if not capture.grab():
+                break
+            index += 1
+            timestamp = index / fps
+
+            if sample_interval is not None:
+                if timestamp + 1e-9 < next_sample:
+                    continue
+                next_sample += sample_interval
+                # Rattraper le retard si la vidéo a moins d'images que la cible
+                if next_sample < timestamp:
+                    next_sample = timestamp + sample_interval
+            elif index % frame_step:
+                continue
+
+            ok, frame = capture.retrieve()
+            if not ok:
+                break
+            yield index, timestamp, frame
+    finally:
+        capture.release()
+
+
+def video_duration(path):
+    """Durée d'une vidéo en secondes (0 si inconnue)"""
+    capture = cv2.VideoCapture(str(path))
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS)
+        frame_count = capture.get(cv2.CAP_PROP_FRAME_COUNT)
+        return frame_count / fps if fps and frame_count > 0 else 0.0
+    finally:
+        capture.release()
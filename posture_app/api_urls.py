@@ -7,10 +7,14 @@ urlpatterns = [
     # API pour les sessions
     path('session/start/', views.start_session_api, name='api_start_session'),
     path('session/<int:session_id>/end/', views.end_session_api, name='api_end_session'),
+    path('session/<int:session_id>/timeline/', views.session_timeline_api, name='api_session_timeline'),
     
     # API pour les alertes
     path('alert/save/', views.save_alert_api, name='api_save_alert'),
+    path('alert/bulk/', views.save_alerts_bulk_api, name='api_save_alerts_bulk'),
     
     # API pour le traitement vidéo
     path('frame/process/', views.process_frame_api, name='api_process_frame'),
+    path('frame/upload/', views.upload_frame_api, name='api_upload_frame'),
+    path('frame/batch/', views.process_frames_batch_api, name='api_process_frames_batch'),
 ]
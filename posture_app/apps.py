@@ -9,5 +9,5 @@ class PostureAppConfig(AppConfig):
     verbose_name = 'Analyse de Posture'
     
     def ready(self):
-        # Import signal handlers if needed
-        pass
+        # Mesure SQL installée sur chaque connexion dès son ouverture
+        from . import middleware  # noqa: F401
@@ -0,0 +1,130 @@
+# posture_app/frame_admission.py
+
+"""
+Admission des frames avant analyse : échéance et limitation de cadence.
+
+- Échéance : le client joint à chaque frame son instant de capture
+  (`captured_at`, millisecondes depuis l'epoch, `Date.now()`). Une frame
+  capturée depuis plus de FRAME_DEADLINE secondes au moment où un thread
+  d'analyse la prend en charge est abandonnée sans décodage ni inférence :
+  son résultat arriverait trop tard pour être utile.
+- Cadence : un seau à jetons par (utilisateur, session) limite les frames
+  analysées à FRAME_RATE_LIMIT par seconde, avec une rafale de
+  FRAME_RATE_BURST. Un onglet trop bavard reçoit 429 avec Retry-After au
+  lieu d'accaparer le pool d'analyse partagé avec les autres utilisateurs.
+"""
+
+import math
+import threading
+import time
+
+from .analyzer.config import PostureConfig
+from .analyzer.session_pool import SessionPool
+from .analyzer.telemetry import inc
+
+
+class FrameRateLimited(Exception):
+    """Cadence maximale de la session dépassée"""
+
+    def __init__(self, retry_after):
+        super().__init__('Trop de frames envoyées, réessayer plus tard')
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Seau à jetons : `rate` jetons par seconde, au plus `burst` en réserve
+
+    Un lot peut coûter plus que la réserve : il est accepté dès qu'un jeton
+    est disponible et le solde devient négatif, ce qui retarde les envois
+    suivants d'autant.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self.tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self, cost=1, now=None):
+        """Consomme `cost` jetons ; retourne 0, ou le délai (s) avant qu'un jeton soit disponible"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self.tokens < 1:
+                return (1 - self.tokens) / self.rate
+            self.tokens -= cost
+            return 0.0
+
+
+def _new_bucket():
+    return TokenBucket(PostureConfig.FRAME_RATE_LIMIT, PostureConfig.FRAME_RATE_BURST)
+
+
+# Un seau inactif se remplit en burst / rate secondes : l'évincer ensuite
+# équivaut à le garder plein
+_buckets = SessionPool(
+    factory=_new_bucket,
+    max_size=PostureConfig.LIVE_SESSION_MAX,
+    idle_timeout=60
+)
+
+
+def admit_frames(user_id, session_id, count=1):
+    """Réserve `count` frames pour la session ; FrameRateLimited si la cadence est dépassée"""
+    if PostureConfig.FRAME_RATE_LIMIT <= 0:
+        return
+    # L'utilisateur fait partie de la clé, comme pour les sessions en cours
+    wait = _buckets.get((user_id, session_id)).take(count)
+    if wait > 0:
+        inc('posture_frames_throttled_total', count)
+        raise FrameRateLimited(max(1, math.ceil(wait)))
+
+
+def frame_deadline(captured_at=None, received=None):
+    """
+    Instant (time.time()) après lequel la frame ne vaut plus la peine d'être analysée
+
+    `captured_at` : instant de capture envoyé par le client (ms depuis
+    l'epoch). Absent, invalide ou trop éloigné de l'horloge du serveur,
+    l'instant de réception le remplace. Retourne None si FRAME_DEADLINE = 0.
+    """
+    if PostureConfig.FRAME_DEADLINE <= 0:
+        return None
+
+    received = time.time() if received is None else received
+    captured = received
+    try:
+        value = float(captured_at) / 1000
+    except (TypeError, ValueError):
+        value = None
+    if value is not None and math.isfinite(value) and abs(received - value) <= PostureConfig.FRAME_CLOCK_SKEW_MAX:
+        # Horloge client en avance : la frame ne peut pas être plus récente que sa réception
+        captured = min(value, received)
+    return captured + PostureConfig.FRAME_DEADLINE
+
+
+def frame_expired(deadline):
+    """La frame a dépassé son échéance (compteur posture_frames_total{outcome="expired"})"""
+    if deadline is None or time.time() <= deadline:
+        return False
+    inc('posture_frames_total', labels=(('outcome', 'expired'),))
+    return True
+
+
+def expired_result():
+    """Résultat renvoyé pour une frame abandonnée avant analyse"""
+    return {
+        'success': True,
+        'detected': False,
+        'fresh': False,
+        'expired': True,
+        'message': 'Frame trop ancienne, ignorée',
+    }
+
+
+def release_session_limit(user_id, session_id):
+    """Oublie le seau d'une session terminée"""
+    _buckets.discard((user_id, session_id))
@@ -0,0 +1,97 @@
+# posture_app/frame_executor.py
+
+"""
+Exécution bornée des analyses de frames pour les vues asynchrones.
+
+Les vues d'API async et le canal WebSocket n'exécutent jamais le décodage
+ni l'inférence dans la boucle d'événements : ce travail est confié à un
+pool de threads dimensionné sur le nombre de cœurs (OpenCV et MediaPipe
+libèrent le GIL). Une connexion inactive ne coûte donc qu'une coroutine.
+
+La file d'attente est bornée : au-delà de FRAME_EXECUTOR_QUEUE_MAX frames
+en attente, une nouvelle frame est refusée immédiatement (ExecutorSaturated)
+et la vue répond 503 avec Retry-After au lieu de laisser la latence croître.
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .analyzer.config import PostureConfig
+from .analyzer.load_control import register_queue_source
+from .analyzer.telemetry import inc, register_gauge
+
+
+class ExecutorSaturated(Exception):
+    """Toutes les places de la file d'analyse sont prises"""
+
+    def __init__(self, retry_after):
+        super().__init__('Serveur saturé, réessayer plus tard')
+        self.retry_after = retry_after
+
+
+class BoundedExecutor:
+    """
+    Pool de threads dont la file d'attente est bornée
+
+    Args:
+        workers: Analyses exécutées simultanément
+        max_queue: Analyses pouvant attendre un thread libre
+        retry_after: Délai conseillé au client quand la file est pleine (s)
+    """
+
+    def __init__(self, workers, max_queue, retry_after=1):
+        self.workers = max(1, int(workers))
+        self.capacity = self.workers + max(0, int(max_queue))
+        self.retry_after = retry_after
+        self.pending = 0  # En cours + en attente
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='posture-frame')
+
+    async def run(self, fn, *args):
+        """Exécute `fn(*args)` dans le pool ; ExecutorSaturated si la file est pleine"""
+        with self._lock:
+            if self.pending >= self.capacity:
+                inc('posture_frames_shed_total')
+                raise ExecutorSaturated(self.retry_after)
+            self.pending += 1
+
+        try:
+            # Contexte propagé comme avec asyncio.to_thread (mesure des étapes)
+            future = self._executor.submit(contextvars.copy_context().run, fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # La place est rendue à la fin du travail, même si le client est parti
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def _release(self):
+        with self._lock:
+            self.pending -= 1
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_frame_executor():
+    """Pool partagé par les vues async et le canal WebSocket du processus"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = BoundedExecutor(
+                    workers=PostureConfig.FRAME_EXECUTOR_WORKERS or os.cpu_count() or 1,
+                    max_queue=PostureConfig.FRAME_EXECUTOR_QUEUE_MAX,
+                    retry_after=PostureConfig.FRAME_RETRY_AFTER
+                )
+    return _executor
+
+
+register_gauge('posture_frame_executor_pending', "Analyses en cours ou en attente dans le pool des vues async",
+               lambda: _executor.pending if _executor is not None else 0)
+# La qualité s'allège dès que la file se remplit, sans attendre que la p95 dérive
+register_queue_source(lambda: _executor.pending if _executor is not None else 0)
@@ -0,0 +1,170 @@
+# posture_app/live_sessions.py
+
+"""
+Registre des sessions d'analyse en cours (par processus).
+
+Chaque frame analysée alimente un PostureAnalyzerSession tenu côté serveur
+et la série temporelle de la session (posture_app.timeline) ;
+`end_session_api` finalise la session à partir de cet état plutôt que des
+statistiques calculées par le navigateur. Le registre est borné : les
+sessions sans frame depuis LIVE_SESSION_TTL secondes (onglet fermé sans
+terminer la session) et les plus anciennes au-delà de LIVE_SESSION_MAX
+sont évincées. Une session évincée qui reçoit de nouvelles frames repart
+d'un état vide marqué `resumed` : sa fin utilise alors les statistiques du
+client, qui couvrent toute la session.
+"""
+
+import time
+
+from .analyzer.config import PostureConfig
+from .analyzer.posture_analyzer import PostureAnalyzerSession
+from .analyzer.session_pool import SessionPool
+from .analyzer.telemetry import register_gauge
+
+
+class LiveSession:
+    """État d'une session en cours : statistiques et mesures par frame en attente"""
+
+    def __init__(self):
+        self.analyzer = PostureAnalyzerSession()
+        self.timeline = None  # Créé à la première frame (identifiant de session requis)
+        self.last_time = None
+        self.key = None
+        self.resumed = False  # Recréée après éviction : statistiques partielles
+
+    def clock(self, current_time):
+        """Instant d'une frame, jamais antérieur à celui de la frame précédente"""
+        if self.last_time is not None and current_time < self.last_time:
+            # Frame d'un lot plus ancienne qu'une frame déjà reçue en direct
+            current_time = self.last_time
+        self.last_time = current_time
+        return current_time
+
+    def flush_timeline(self):
+        if self.timeline is not None:
+            self.timeline.flush()
+
+
+def _flush_evicted(live):
+    # Session abandonnée : conserver au moins les mesures déjà reçues
+    live.flush_timeline()
+    if live.key is not None:
+        _evicted.get(live.key)
+
+
+# Sessions évincées du registre avant leur fin (état serveur perdu)
+_evicted = SessionPool(
+    factory=lambda: True,
+    max_size=PostureConfig.LIVE_SESSION_MAX,
+    idle_timeout=None
+)
+
+
+_registry = SessionPool(
+    factory=LiveSession,
+    max_size=PostureConfig.LIVE_SESSION_MAX,
+    idle_timeout=PostureConfig.LIVE_SESSION_TTL,
+    on_evict=_flush_evicted
+)
+
+
+# Sessions dont l'appartenance à l'utilisateur a été vérifiée en base
+# (une requête par session et par processus, pas une par frame)
+_owned = SessionPool(
+    factory=lambda: True,
+    max_size=PostureConfig.LIVE_SESSION_MAX,
+    idle_timeout=PostureConfig.LIVE_SESSION_TTL
+)
+
+
+def owns_session(user_id, session_id):
+    """La session d'analyse existe, appartient à l'utilisateur et n'est pas terminée"""
+    key = _key(user_id, session_id)
+    if key in _owned:
+        _owned.get(key)  # Rafraîchit l'entrée
+        return True
+
+    from .models import PostureSession
+
+    owned = PostureSession.objects.filter(
+        id=session_id, user_id=user_id, end_time__isnull=True
+    ).exists()
+    if owned:
+        _owned.get(key)
+    return owned
+
+
+def forget_session(user_id, session_id):
+    """Session terminée : les frames suivantes sont refusées"""
+    _owned.discard(_key(user_id, session_id))
+
+
+def _key(user_id, session_id):
+    # L'utilisateur fait partie de la clé : un client ne peut pas alimenter
+    # la session d'un autre en devinant son identifiant
+    return (user_id, session_id)
+
+
+def record_frame(user_id, session_id, result, current_time=None):
+    """
+    Met à jour la session en cours avec le résultat d'une frame
+
+    Returns:
+        dict d'état de la session (alerte en cours, durée de mauvaise
+        posture, nombre d'alertes), ou None si la frame n'est pas exploitable
+    """
+    if session_id is None or not result.get('detected'):
+        return None
+    # Ni état ni bloc de mesures pour une session d'un autre utilisateur
+    if not owns_session(user_id, session_id):
+        return None
+
+    if current_time is None:
+        current_time = time.time()
+
+    key = _key(user_id, session_id)
+    with _registry.lease(key) as live:
+        if live.key is None:
+            live.key = key
+            live.resumed = _evicted.pop(key) is not None
+        current_time = live.clock(current_time)
+        alert, duration = live.analyzer.update(
+            result['is_good_posture'],
+            result['neck_angle'],
+            result['back_angle'],
+            result['shoulder_diff'],
+            current_time=current_time
+        )
+        if live.timeline is None:
+            from .timeline import TimelineBuffer
+            live.timeline = TimelineBuffer(session_id)
+        live.timeline.append(
+            current_time,
+            result['neck_angle'],
+            result['back_angle'],
+            result['shoulder_diff'],
+            result['is_good_posture']
+        )
+        return {
+            'alert': alert,
+            'bad_posture_duration': duration,
+            'alert_count': live.analyzer.alert_count,
+        }
+
+
+def pop_live_session(user_id, session_id):
+    """
+    Retire et retourne l'état d'une session (None s'il n'existe pas ou a été
+    évincé ; `resumed` si l'état ne couvre que les frames reçues après éviction)
+    """
+    key = _key(user_id, session_id)
+    _evicted.pop(key)
+    return _registry.pop(key)
+
+
+def live_session_count():
+    return len(_registry)
+
+
+register_gauge('posture_live_sessions', "Sessions d'analyse suivies en mémoire dans ce processus",
+               live_session_count)
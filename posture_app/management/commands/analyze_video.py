@@ -0,0 +1,148 @@
+# posture_app/management/commands/analyze_video.py
+
+import itertools
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from posture_app.analyzer.posture_analyzer import (
+    OUTPUT_LANDMARKS, PostureAnalyzerSession, analyze_frame, release_session
+)
+from posture_app.analyzer.video import iter_video_frames, video_duration
+from posture_app.models import PostureAlert, PostureSession
+from posture_app.stats import update_daily_stats, update_rollups, update_user_totals
+from posture_app.timeline import TimelineBuffer
+
+# Nombre d'alertes gardées en mémoire avant écriture en base
+ALERT_BATCH_SIZE = 500
+
+
+def alert_type_for(result):
+    """Type d'alerte correspondant aux problèmes détectés sur une frame"""
+    failed = [
+        alert_type
+        for alert_type, key in (('neck', 'neck_ok'), ('back', 'back_ok'), ('shoulders', 'shoulders_ok'))
+        if not result[key]
+    ]
+    return failed[0] if len(failed) == 1 else 'multiple'
+
+
+class Command(BaseCommand):
+    help = "Analyse la posture dans un fichier vidéo et enregistre une session"
+
+    def add_arguments(self, parser):
+        parser.add_argument('video', help='Chemin du fichier vidéo (MP4, AVI, ...)')
+        parser.add_argument('--user', required=True, help="Nom de l'utilisateur propriétaire de la session")
+        parser.add_argument('--fps', type=float, default=5.0,
+                            help='Fréquence d\'échantillonnage cible (0 = utiliser --skip)')
+        parser.add_argument('--skip', type=int, default=1,
+                            help='Analyser une frame sur N (si --fps vaut 0)')
+        parser.add_argument('--max-frames', type=int, default=0,
+                            help='Nombre max de frames analysées (0 = toutes)')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"Utilisateur introuvable: {options['user']}")
+
+        path = options['video']
+        try:
+            frames = iter_video_frames(
+                path, target_fps=options['fps'] or None, frame_step=options['skip']
+            )
+            first = next(frames, None)
+        except IOError as e:
+            raise CommandError(str(e))
+        if first is None:
+            raise CommandError(f'Aucune frame lisible dans {path}')
+
+        session = PostureSession.objects.create(user=user)
+        analyzer = PostureAnalyzerSession()
+        timeline = TimelineBuffer(session.id)
+        origin = session.start_time.timestamp()
+        pending_alerts = []
+        analyzed = detected = 0
+        last_timestamp = 0.0
+        started = time.perf_counter()
+
+        try:
+            for _, timestamp, frame in itertools.chain([first], frames):
+                if options['max_frames'] and analyzed >= options['max_frames']:
+                    break
+
+                result = analyze_frame(
+                    frame, session_id=session.id, output=OUTPUT_LANDMARKS, timestamp=timestamp
+                )
+                analyzed += 1
+                last_timestamp = timestamp
+                if not result.get('detected'):
+                    continue
+                detected += 1
+
+                alert, duration = analyzer.update(
+                    result['is_good_posture'],
+                    result['neck_angle'],
+                    result['back_angle'],
+                    result['shoulder_diff'],
+                    current_time=timestamp
+                )
+                timeline.append(
+                    origin + timestamp,
+                    result['neck_angle'],
+                    result['back_angle'],
+                    result['shoulder_diff'],
+                    result['is_good_posture']
+                )
+                if alert:
+                    pending_alerts.append(PostureAlert(
+                        session=session,
+                        timestamp=session.start_time + timedelta(seconds=timestamp),
+                        alert_type=alert_type_for(result),
+                        neck_angle=result['neck_angle'],
+                        back_angle=result['back_angle'],
+                        shoulder_diff=result['shoulder_diff'],
+                        duration=timedelta(seconds=duration)
+                    ))
+                    if len(pending_alerts) >= ALERT_BATCH_SIZE:
+                        PostureAlert.objects.bulk_create(pending_alerts)
+                        pending_alerts = []
+        finally:
+            release_session(session.id)
+
+        elapsed = time.perf_counter() - started
+        total_time = max(video_duration(path), last_timestamp)
+        analyzer.flush(total_time)
+        stats = analyzer.get_statistics(total_time)
+
+        with transaction.atomic():
+            PostureAlert.objects.bulk_create(pending_alerts)
+            timeline.flush()
+
+            session.end_time = session.start_time + timedelta(seconds=total_time)
+            session.total_bad_posture_time = timedelta(seconds=stats['bad_posture_time'])
+            session.bad_posture_percentage = stats['bad_posture_percentage']
+            session.alert_count = stats['alert_count']
+            if detected:
+                session.average_neck_angle = stats['avg_neck_angle']
+                session.average_back_angle = stats['avg_back_angle']
+                session.average_shoulder_diff = stats['avg_shoulder_diff']
+                session.metrics_summary = stats['metrics_summary']
+            session.save()
+
+            update_daily_stats(user, session)
+            update_user_totals(user, session)
+            update_rollups(user, session)
+
+        throughput = analyzed / elapsed if elapsed > 0 else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f'Session {session.id} enregistrée : {analyzed} frames analysées '
+            f'({detected} avec personne détectée), {stats["alert_count"]} alertes, '
+            f'score {session.posture_score}%'
+        ))
+        self.stdout.write(
+            f'Débit : {throughput:.1f} frames/s ({elapsed:.1f}s pour {total_time:.1f}s de vidéo)'
+        )
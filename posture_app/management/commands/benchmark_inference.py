@@ -0,0 +1,238 @@
+# posture_app/management/commands/benchmark_inference.py
+
+import base64
+import json
+import os
+import platform
+import time
+import tracemalloc
+from pathlib import Path
+
+import cv2
+import mediapipe as mp
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from posture_app.analyzer.inference_engine import get_inference_engine
+from posture_app.analyzer.posture_analyzer import (
+    OUTPUT_IMAGE, OUTPUT_LANDMARKS, analyze_frame, configure_pose_detector, release_session
+)
+from posture_app.analyzer.profiling import record_stages
+from posture_app.views import _decode_base64_frame, _decode_frame
+
+PERCENTILES = (50, 95, 99)
+
+# Identifiant de session réservé au benchmark (détecteur et état dédiés)
+BENCHMARK_SESSION = 'benchmark'
+
+# Étapes exécutées seulement quand une personne est détectée, selon le mode de réponse
+DETECTED_STAGES = {
+    OUTPUT_IMAGE: ('geometry', 'draw_landmarks', 'imencode', 'base64_encode'),
+    OUTPUT_LANDMARKS: ('geometry',),
+}
+
+
+def synthetic_corpus(count, seed=0):
+    """Frames 1280x720 texturées (ni sombres ni floues) ; aucune personne à détecter"""
+    rng = np.random.default_rng(seed)
+    gradient = np.linspace(40, 200, 1280, dtype=np.float32)[None, :, None]
+    frames = []
+    for _ in range(count):
+        noise = rng.normal(0, 25, (720, 1280, 3)).astype(np.float32)
+        frames.append(np.clip(gradient + noise, 0, 255).astype(np.uint8))
+    return frames
+
+
+def load_corpus(directory):
+    """Frames JPEG/PNG enregistrées, triées par nom de fichier"""
+    paths = sorted(
+        path for path in Path(directory).iterdir()
+        if path.suffix.lower() in ('.jpg', '.jpeg', '.png', '.webp')
+    )
+    frames = [cv2.imread(str(path), cv2.IMREAD_COLOR) for path in paths]
+    return [frame for frame in frames if frame is not None]
+
+
+def parse_resolution(value):
+    try:
+        width, height = (int(part) for part in value.lower().split('x'))
+    except ValueError:
+        raise CommandError(f'Résolution invalide: {value} (attendu LARGEURxHAUTEUR)')
+    return width, height
+
+
+def summarize(samples, scale=1000):
+    """Percentiles (ms par défaut) d'une liste de durées en secondes"""
+    values = np.array(samples) * scale
+    summary = {'count': len(values), 'mean': round(float(values.mean()), 3)}
+    for p in PERCENTILES:
+        summary[f'p{p}'] = round(float(np.percentile(values, p)), 3)
+    return summary
+
+
+class Command(BaseCommand):
+    help = "Mesure le coût de analyze_frame, étape par étape, sur un corpus de frames"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--frames',
+                            help='Dossier de frames enregistrées (sinon corpus synthétique, sans personne : '
+                                 'géométrie, annotation et encodage ne sont pas mesurés)')
+        parser.add_argument('--count', type=int, default=50,
+                            help='Taille du corpus synthétique')
+        parser.add_argument('--resolutions', default='640x480,1280x720',
+                            help='Résolutions des frames envoyées (LxH, séparées par des virgules)')
+        parser.add_argument('--complexity', default='0,1',
+                            help='Valeurs de model_complexity MediaPipe (séparées par des virgules)')
+        parser.add_argument('--output', choices=(OUTPUT_IMAGE, OUTPUT_LANDMARKS), default=OUTPUT_IMAGE)
+        parser.add_argument('--repeat', type=int, default=1, help='Passages sur le corpus')
+        parser.add_argument('--warmup', type=int, default=5, help='Frames ignorées au début de chaque série')
+        parser.add_argument('--gate', action='store_true',
+                            help='Passer par le filtre avant inférence (désactivé par défaut)')
+        parser.add_argument('--allocations', action='store_true',
+                            help='Mesurer le pic de mémoire allouée par frame (tracemalloc, ralentit la série)')
+        parser.add_argument('--json', dest='json_path', help='Écrire les résultats dans un fichier JSON')
+
+    def handle(self, *args, **options):
+        if options['frames']:
+            corpus = load_corpus(options['frames'])
+            if not corpus:
+                raise CommandError(f"Aucune image lisible dans {options['frames']}")
+        else:
+            corpus = synthetic_corpus(options['count'])
+
+        resolutions = [parse_resolution(value) for value in options['resolutions'].split(',')]
+        complexities = [int(value) for value in options['complexity'].split(',')]
+
+        if get_inference_engine() is not None:
+            self.stdout.write(self.style.WARNING(
+                'Moteur d\'inférence multi-processus actif : copie en mémoire partagée '
+                'et pose.process sont mesurés ensemble (étape engine_infer)'
+            ))
+
+        runs = []
+        try:
+            for complexity in complexities:
+                configure_pose_detector(complexity)
+                for resolution in resolutions:
+                    runs.append(self._run(corpus, resolution, complexity, options))
+        finally:
+            release_session(BENCHMARK_SESSION)
+            configure_pose_detector(None)
+
+        for run in runs:
+            self._report(run)
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as f:
+                json.dump({
+                    'environment': {
+                        'python': platform.python_version(),
+                        'platform': platform.platform(),
+                        'cpu_count': os.cpu_count(),
+                        'opencv': cv2.__version__,
+                        'mediapipe': mp.__version__,
+                        'numpy': np.__version__,
+                    },
+                    'corpus': options['frames'] or f"synthétique ({options['count']} frames)",
+                    'output': options['output'],
+                    'gate': options['gate'],
+                    'runs': runs,
+                }, f, indent=2)
+            self.stdout.write(f"Résultats écrits dans {options['json_path']}")
+
+    def _run(self, corpus, resolution, complexity, options):
+        """Une série : toutes les frames du corpus à une résolution et une complexité"""
+        # Frames préparées comme les enverrait le navigateur (JPEG en base64)
+        payloads = []
+        for frame in corpus:
+            resized = cv2.resize(frame, resolution, interpolation=cv2.INTER_AREA)
+            _, buffer = cv2.imencode('.jpg', resized, [cv2.IMWRITE_JPEG_QUALITY, 85])
+            payloads.append('data:image/jpeg;base64,' + base64.b64encode(buffer).decode('ascii'))
+
+        release_session(BENCHMARK_SESSION)
+        stages, totals, allocations = {}, [], []
+        detected = 0
+        errors = []
+        started = None
+
+        frames = payloads * max(1, options['repeat'])
+        for index, payload in enumerate(frames):
+            if index == options['warmup']:
+                started = time.perf_counter()
+
+            if options['allocations']:
+                tracemalloc.start()
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+
+            frame_started = time.perf_counter()
+            with record_stages() as timings:
+                frame = _decode_frame(_decode_base64_frame(payload))
+                result = analyze_frame(
+                    frame, session_id=BENCHMARK_SESSION, output=options['output'],
+                    use_gate=options['gate'], rgb=True
+                )
+            elapsed = time.perf_counter() - frame_started
+
+            if options['allocations']:
+                peak = tracemalloc.get_traced_memory()[1] - baseline
+                tracemalloc.stop()
+
+            if index < options['warmup']:
+                continue
+            totals.append(elapsed)
+            if options['allocations']:
+                allocations.append(peak)
+            detected += bool(result.get('detected'))
+            if not result.get('success'):
+                errors.append(result.get('error'))
+            for name, duration in timings.items():
+                stages.setdefault(name, []).append(duration)
+
+        if not totals:
+            raise CommandError('Aucune frame mesurée (corpus plus petit que --warmup)')
+
+        wall = time.perf_counter() - started
+        skipped = [name for name in DETECTED_STAGES[options['output']] if name not in stages]
+        return {
+            'resolution': f'{resolution[0]}x{resolution[1]}',
+            'model_complexity': complexity,
+            'frames': len(totals),
+            'detected': detected,
+            'errors': len(errors),
+            'first_error': errors[0] if errors else None,
+            'throughput_fps': round(len(totals) / wall, 2),
+            'total_ms': summarize(totals),
+            'stages_ms': {name: summarize(samples) for name, samples in stages.items()},
+            'skipped_stages': skipped,
+            'peak_alloc_kib': summarize(allocations, scale=1 / 1024) if allocations else None,
+        }
+
+    def _report(self, run):
+        self.stdout.write(self.style.SUCCESS(
+            f"\n{run['resolution']} / complexité {run['model_complexity']} : "
+            f"{run['throughput_fps']} frames/s ({run['detected']}/{run['frames']} avec personne détectée)"
+        ))
+        if run['errors']:
+            self.stdout.write(self.style.ERROR(
+                f"{run['errors']} frames en erreur : {run['first_error']}"
+            ))
+        if run['skipped_stages']:
+            self.stdout.write(self.style.WARNING(
+                "Aucune personne détectée : le total ne comprend pas les étapes suivantes "
+                "(utiliser --frames avec des captures réelles)"
+            ))
+        header = f"{'étape':<16}{'n':>6}" + ''.join(f"{f'p{p} ms':>10}" for p in PERCENTILES)
+        self.stdout.write(header)
+        rows = list(run['stages_ms'].items()) + [('total', run['total_ms'])]
+        for name, summary in rows:
+            self.stdout.write(
+                f"{name:<16}{summary['count']:>6}" + ''.join(f"{summary[f'p{p}']:>10.3f}" for p in PERCENTILES)
+            )
+        for name in run['skipped_stages']:
+            self.stdout.write(f"{name:<16}{0:>6}  non exécutée")
+        if run['peak_alloc_kib']:
+            summary = run['peak_alloc_kib']
+            self.stdout.write(
+                f"{'alloc KiB':<16}{summary['count']:>6}" + ''.join(f"{summary[f'p{p}']:>10.0f}" for p in PERCENTILES)
+            )
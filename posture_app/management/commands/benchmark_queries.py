@@ -0,0 +1,179 @@
+# posture_app/management/commands/benchmark_queries.py
+
+import json
+import re
+import time
+from collections import Counter
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+
+from posture_app.models import PostureSession
+from posture_app.stats import update_daily_stats, update_rollups, update_user_totals
+
+from .generate_synthetic_data import USERNAME_PREFIX
+
+# Au-delà, une même requête répétée dans une vue signale probablement un N+1
+REPEAT_WARNING = 5
+
+_LITERALS = re.compile(r"'[^']*'|\b\d+(\.\d+)?\b")
+
+
+class QueryRecorder:
+    """Enregistre les requêtes SQL exécutées (texte, durée) via execute_wrapper"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, params, time.perf_counter() - started))
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Mesure le nombre de requêtes et la latence des vues principales"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5,
+                            help='Utilisateurs synthétiques échantillonnés')
+        parser.add_argument('--user', help="Mesurer un utilisateur précis")
+        parser.add_argument('--iterations', type=int, default=20, help='Mesures par vue et utilisateur')
+        parser.add_argument('--json', dest='json_path', help='Écrire les résultats dans un fichier JSON')
+
+    def handle(self, *args, **options):
+        if options['user']:
+            users = list(User.objects.filter(username=options['user']))
+        else:
+            users = list(User.objects.filter(username__startswith=USERNAME_PREFIX).order_by('?')[:options['users']])
+        if not users:
+            raise CommandError(
+                'Aucun utilisateur à mesurer (lancer generate_synthetic_data ou utiliser --user)'
+            )
+
+        results = {}
+        for name, run in self._targets():
+            samples = []
+            for user in users:
+                client = Client()
+                client.force_login(user)
+                session = PostureSession.objects.filter(user=user, end_time__isnull=False).first()
+                for _ in range(options['iterations']):
+                    samples.append(self._measure(run, client, user, session))
+            results[name] = self._summarize(samples)
+
+        self._report(results, users, options['iterations'])
+        if options['json_path']:
+            with open(options['json_path'], 'w') as f:
+                json.dump({
+                    'vendor': connection.vendor,
+                    'users': [user.username for user in users],
+                    'iterations': options['iterations'],
+                    'results': results,
+                }, f, indent=2)
+            self.stdout.write(f"Résultats écrits dans {options['json_path']}")
+
+    def _targets(self):
+        """(nom, fonction(client, user, session)) des opérations mesurées"""
+        def get(url):
+            def run(client, user, session):
+                response = client.get(url(session) if callable(url) else url)
+                if response.status_code != 200:
+                    raise CommandError(f'{response.status_code} sur {response.request["PATH_INFO"]}')
+            return run
+
+        def end_session(client, user, session):
+            # Mise à jour des agrégats d'une session terminée, annulée ensuite
+            try:
+                with transaction.atomic():
+                    update_daily_stats(user, session)
+                    update_user_totals(user, session)
+                    update_rollups(user, session)
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+        return [
+            ('dashboard', get('/dashboard/')),
+            ('statistics_7', get('/statistics/?period=7')),
+            ('statistics_30', get('/statistics/?period=30')),
+            ('statistics_90', get('/statistics/?period=90')),
+            ('session_detail', get(lambda session: f'/session/{session.id}/')),
+            ('session_timeline', get(lambda session: f'/api/session/{session.id}/timeline/')),
+            ('end_session_stats', end_session),
+        ]
+
+    def _measure(self, run, client, user, session):
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with connection.execute_wrapper(recorder):
+            run(client, user, session)
+        return time.perf_counter() - started, recorder.queries
+
+    def _summarize(self, samples):
+        latencies = np.array([latency for latency, _ in samples]) * 1000
+        db_times = np.array([sum(q[2] for q in queries) for _, queries in samples]) * 1000
+        counts = [len(queries) for _, queries in samples]
+
+        # Requêtes identiques à des valeurs près, répétées dans une même mesure
+        repeated = Counter()
+        for _, queries in samples:
+            for sql, count in Counter(_LITERALS.sub('?', sql) for sql, _, _ in queries).items():
+                repeated[sql] = max(repeated[sql], count)
+
+        distinct = {}
+        for _, queries in samples:
+            for sql, params, _ in queries:
+                distinct.setdefault(sql, params)
+
+        return {
+            'queries': int(max(counts)),
+            'latency_ms': {
+                f'p{p}': round(float(np.percentile(latencies, p)), 2) for p in (50, 90, 99)
+            },
+            'db_time_ms_p50': round(float(np.percentile(db_times, 50)), 2),
+            'repeated_queries': [sql for sql, count in repeated.items() if count > REPEAT_WARNING],
+            'unindexed_plans': self._unindexed_plans(distinct),
+        }
+
+    def _unindexed_plans(self, distinct):
+        """Parcours complets et tris sans index d'après le plan SQLite (index manquant probable)"""
+        if connection.vendor != 'sqlite':
+            return []
+        scans = set()
+        with connection.cursor() as cursor:
+            for sql, params in distinct.items():
+                if not sql.lstrip().upper().startswith('SELECT'):
+                    continue
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                for row in cursor.fetchall():
+                    detail = row[-1]
+                    if (detail.startswith('SCAN ') and 'USING' not in detail) or \
+                            detail.startswith('USE TEMP B-TREE'):
+                        scans.add(f'{detail} <- {sql[:100]}')
+        return sorted(scans)
+
+    def _report(self, results, users, iterations):
+        self.stdout.write(
+            f'{len(users)} utilisateurs x {iterations} mesures ({connection.vendor})\n'
+        )
+        self.stdout.write(f"{'opération':<20}{'requêtes':>9}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'SQL p50':>10}")
+        for name, result in results.items():
+            latency = result['latency_ms']
+            self.stdout.write(
+                f"{name:<20}{result['queries']:>9}{latency['p50']:>10}{latency['p90']:>10}"
+                f"{latency['p99']:>10}{result['db_time_ms_p50']:>10}"
+            )
+            for sql in result['repeated_queries']:
+                self.stdout.write(self.style.WARNING(f'  N+1 probable : {sql[:120]}'))
+            for scan in result['unindexed_plans']:
+                self.stdout.write(self.style.WARNING(f'  Plan sans index : {scan}'))
@@ -0,0 +1,177 @@
+# posture_app/management/commands/generate_synthetic_data.py
+
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from posture_app.analyzer.config import PostureConfig
+from posture_app.models import DailyStats, PostureAlert, PostureSession, UserProfile
+from posture_app.stats import rebuild_rollups
+
+# Préfixe des comptes générés (permet de les supprimer avec --clear)
+USERNAME_PREFIX = 'synthetic_'
+
+ALERT_TYPES = [alert_type for alert_type, _ in PostureAlert.ALERT_TYPES]
+ALERT_TYPE_WEIGHTS = [0.35, 0.25, 0.15, 0.25]
+
+# Nombre max d'objets par INSERT
+INSERT_BATCH_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = "Génère des utilisateurs, sessions, alertes et statistiques réalistes (tests de charge)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help="Nombre d'utilisateurs")
+        parser.add_argument('--sessions', type=int, default=200,
+                            help='Sessions moyennes par utilisateur')
+        parser.add_argument('--days', type=int, default=365, help="Profondeur de l'historique (jours)")
+        parser.add_argument('--alerts', type=float, default=1.0,
+                            help="Multiplicateur du nombre d'alertes par session")
+        parser.add_argument('--seed', type=int, default=0, help='Graine du générateur aléatoire')
+        parser.add_argument('--users-per-batch', type=int, default=20,
+                            help='Utilisateurs écrits par transaction')
+        parser.add_argument('--clear', action='store_true',
+                            help='Supprimer les données synthétiques existantes avant génération')
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+
+        if options['clear']:
+            deleted, _ = User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+            self.stdout.write(f'{deleted} objets synthétiques supprimés')
+
+        first = User.objects.filter(username__startswith=USERNAME_PREFIX).count()
+        password = make_password('synthetic')  # Hachage coûteux : calculé une seule fois
+        started = time.perf_counter()
+        counts = defaultdict(int)
+
+        batch = max(1, options['users_per_batch'])
+        for offset in range(0, options['users'], batch):
+            numbers = range(first + offset, first + min(offset + batch, options['users']))
+            with transaction.atomic():
+                users = User.objects.bulk_create([
+                    User(username=f'{USERNAME_PREFIX}{number:07d}', password=password)
+                    for number in numbers
+                ])
+                for key, value in self._generate_users(users, rng, options).items():
+                    counts[key] += value
+
+            self.stdout.write(
+                f"{min(offset + batch, options['users'])}/{options['users']} utilisateurs, "
+                f"{counts['sessions']} sessions, {counts['alerts']} alertes"
+            )
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['users']} utilisateurs, {counts['sessions']} sessions, "
+            f"{counts['alerts']} alertes, {counts['daily_stats']} stats quotidiennes "
+            f"et {counts['rollups']} agrégats générés en {elapsed:.1f}s"
+        ))
+
+    def _generate_users(self, users, rng, options):
+        """Sessions, alertes, statistiques et totaux d'un lot d'utilisateurs"""
+        now = timezone.now()
+        sessions, profiles, daily = [], [], {}
+
+        for user in users:
+            # Sessions surtout en semaine, aux heures de bureau
+            count = rng.poisson(options['sessions'])
+            days_ago = rng.integers(0, options['days'], count)
+            weekend = np.array([(now - timedelta(days=int(d))).weekday() >= 5 for d in days_ago], dtype=bool)
+            keep = ~weekend | (rng.random(count) < 0.2)
+            days_ago = days_ago[keep]
+            count = len(days_ago)
+
+            hours = rng.uniform(8, 18, count)
+            durations = np.clip(rng.lognormal(np.log(45 * 60), 0.6, count), 5 * 60, 4 * 3600)
+            bad_ratios = rng.beta(2, 5, count)
+
+            profile = UserProfile(user=user, occupation='Synthétique')
+            for day, hour, duration, bad_ratio in zip(days_ago, hours, durations, bad_ratios):
+                start = (now - timedelta(days=int(day))).replace(
+                    hour=int(hour), minute=int(hour % 1 * 60), second=0, microsecond=0
+                )
+                if start > now:
+                    start -= timedelta(days=1)
+                duration = timedelta(seconds=int(duration))
+                bad_time = duration * float(bad_ratio)
+
+                # bulk_create n'appelle pas save() : durée et score calculés ici
+                session = PostureSession(
+                    user=user,
+                    start_time=start,
+                    end_time=start + duration,
+                    duration=duration,
+                    total_bad_posture_time=bad_time,
+                    bad_posture_percentage=float(bad_ratio) * 100,
+                    alert_count=int(rng.poisson(
+                        bad_time.total_seconds() / (PostureConfig.BAD_POSTURE_ALERT_TIME * 30) * options['alerts']
+                    )),
+                    average_neck_angle=float(rng.normal(160, 8)),
+                    average_back_angle=float(rng.normal(165, 6)),
+                    average_shoulder_diff=float(abs(rng.normal(6, 4))),
+                    posture_score=round(100 - float(bad_ratio) * 100, 2),
+                )
+                sessions.append(session)
+
+                profile.total_sessions += 1
+                profile.total_time += duration
+                profile.total_score += session.posture_score
+                profile.total_alerts += session.alert_count
+
+                stat = daily.setdefault((user.pk, timezone.localdate(start)), DailyStats(
+                    user=user, date=timezone.localdate(start)
+                ))
+                stat.average_score = (
+                    stat.average_score * stat.session_count + session.posture_score
+                ) / (stat.session_count + 1)
+                stat.session_count += 1
+                stat.total_time += duration
+                stat.bad_posture_time += bad_time
+                stat.alert_count += session.alert_count
+
+            profiles.append(profile)
+
+        PostureSession.objects.bulk_create(sessions, batch_size=INSERT_BATCH_SIZE)
+        UserProfile.objects.bulk_create(profiles, batch_size=INSERT_BATCH_SIZE)
+        DailyStats.objects.bulk_create(daily.values(), batch_size=INSERT_BATCH_SIZE)
+
+        # Alertes réparties pendant la mauvaise posture de chaque session
+        alerts = []
+        alert_count = 0
+        for session in sessions:
+            if not session.alert_count:
+                continue
+            offsets = np.sort(rng.uniform(0, session.duration.total_seconds(), session.alert_count))
+            types = rng.choice(ALERT_TYPES, session.alert_count, p=ALERT_TYPE_WEIGHTS)
+            for offset, alert_type in zip(offsets, types):
+                alerts.append(PostureAlert(
+                    session=session,
+                    timestamp=session.start_time + timedelta(seconds=float(offset)),
+                    alert_type=str(alert_type),
+                    neck_angle=float(rng.normal(140, 10)),
+                    back_angle=float(rng.normal(150, 8)),
+                    shoulder_diff=float(abs(rng.normal(15, 5))),
+                    duration=timedelta(seconds=float(rng.uniform(10, 120))),
+                ))
+            if len(alerts) >= INSERT_BATCH_SIZE:
+                PostureAlert.objects.bulk_create(alerts)
+                alert_count += len(alerts)
+                alerts = []
+        PostureAlert.objects.bulk_create(alerts)
+        alert_count += len(alerts)
+
+        return {
+            'sessions': len(sessions),
+            'alerts': alert_count,
+            'daily_stats': len(daily),
+            'rollups': rebuild_rollups([user.pk for user in users]),
+        }
@@ -0,0 +1,54 @@
+# posture_app/management/commands/rebuild_daily_stats.py
+
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models.functions import TruncDate
+
+from posture_app.models import DailyStats, PostureSession
+from posture_app.stats import recompute_daily_stats
+
+
+class Command(BaseCommand):
+    help = "Recalcule entièrement les statistiques quotidiennes (réparation)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Limiter à un utilisateur")
+        parser.add_argument('--since', help='Premier jour à recalculer (AAAA-MM-JJ)')
+
+    def handle(self, *args, **options):
+        sessions = PostureSession.objects.filter(end_time__isnull=False)
+        daily_stats = DailyStats.objects.all()
+
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"Utilisateur introuvable: {options['user']}")
+            sessions = sessions.filter(user=user)
+            daily_stats = daily_stats.filter(user=user)
+
+        if options['since']:
+            try:
+                since = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError(f"Date invalide: {options['since']}")
+            sessions = sessions.filter(start_time__date__gte=since)
+            daily_stats = daily_stats.filter(date__gte=since)
+
+        # Jours ayant des sessions, et lignes existantes éventuellement orphelines
+        days = set(
+            sessions.annotate(day=TruncDate('start_time'))
+            .values_list('user_id', 'day')
+            .distinct()
+        )
+        days.update(daily_stats.values_list('user_id', 'date'))
+
+        users = User.objects.in_bulk({user_id for user_id, _ in days})
+        for user_id, day in sorted(days):
+            with transaction.atomic():
+                recompute_daily_stats(users[user_id], day)
+
+        self.stdout.write(self.style.SUCCESS(f'{len(days)} jours recalculés'))
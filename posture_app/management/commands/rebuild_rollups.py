@@ -0,0 +1,32 @@
+# posture_app/management/commands/rebuild_rollups.py
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from posture_app.stats import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recalcule les agrégats jour/semaine/mois de tout l'historique"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Limiter à un utilisateur")
+        parser.add_argument('--batch-size', type=int, default=200,
+                            help='Utilisateurs traités par lot (une transaction par lot)')
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('pk')
+        if options['user']:
+            users = users.filter(username=options['user'])
+            if not users.exists():
+                raise CommandError(f"Utilisateur introuvable: {options['user']}")
+
+        user_ids = list(users.values_list('pk', flat=True))
+        batch_size = max(1, options['batch_size'])
+        created = 0
+        for offset in range(0, len(user_ids), batch_size):
+            created += rebuild_rollups(user_ids[offset:offset + batch_size])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{created} agrégats recalculés pour {len(user_ids)} utilisateurs'
+        ))
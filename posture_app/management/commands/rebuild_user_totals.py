@@ -0,0 +1,29 @@
+# posture_app/management/commands/rebuild_user_totals.py
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from posture_app.stats import recompute_user_totals
+
+
+class Command(BaseCommand):
+    help = "Recalcule les totaux de sessions stockés sur les profils (réparation)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Limiter à un utilisateur")
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options['user']:
+            users = users.filter(username=options['user'])
+            if not users.exists():
+                raise CommandError(f"Utilisateur introuvable: {options['user']}")
+
+        count = 0
+        for user in users.iterator():
+            with transaction.atomic():
+                recompute_user_totals(user)
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f'{count} profils recalculés'))
@@ -0,0 +1,91 @@
+# posture_app/middleware.py
+
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db.backends.signals import connection_created
+
+from .analyzer.telemetry import inc, observe
+
+# Compteur SQL de la requête HTTP en cours : propagé aux threads de
+# sync_to_async et du pool d'analyse, qui ont chacun leur connexion
+_current_timer = ContextVar('db_timer', default=None)
+
+
+class _DatabaseTimer:
+    """Compte les requêtes SQL d'une requête HTTP et leur durée"""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+def _time_query(execute, sql, params, many, context):
+    """execute_wrapper installé sur chaque connexion, actif pendant une requête HTTP"""
+    timer = _current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timer.queries += 1
+        timer.seconds += time.perf_counter() - started
+
+
+def _install(connection, **kwargs):
+    """Receveur de connection_created (module importé par PostureAppConfig.ready)"""
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_query)
+
+
+connection_created.connect(_install)
+
+
+class MetricsMiddleware:
+    """Durée, statut et temps passé en base de chaque requête, par vue (voir /metrics)"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        timer = _DatabaseTimer()
+        token = _current_timer.set(timer)
+        started = time.perf_counter()
+        inc('posture_http_requests_in_flight')
+        try:
+            response = self.get_response(request)
+        finally:
+            inc('posture_http_requests_in_flight', -1)
+            _current_timer.reset(token)
+        return self._record(request, response, timer, started)
+
+    async def __acall__(self, request):
+        timer = _DatabaseTimer()
+        token = _current_timer.set(timer)
+        started = time.perf_counter()
+        inc('posture_http_requests_in_flight')
+        try:
+            response = await self.get_response(request)
+        finally:
+            inc('posture_http_requests_in_flight', -1)
+            _current_timer.reset(token)
+        return self._record(request, response, timer, started)
+
+    def _record(self, request, response, timer, started):
+        match = request.resolver_match
+        view = (('view', match.url_name if match and match.url_name else 'unmatched'),)
+        observe('posture_http_request_seconds', time.perf_counter() - started, view)
+        inc('posture_http_requests_total', labels=view + (('status', str(response.status_code)),))
+        inc('posture_db_queries_total', timer.queries, view)
+        inc('posture_db_seconds_total', timer.seconds, view)
+        return response
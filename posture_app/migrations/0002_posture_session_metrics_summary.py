@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posture_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='posturesession',
+            name='metrics_summary',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
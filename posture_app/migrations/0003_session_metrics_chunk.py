@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posture_app', '0002_posture_session_metrics_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionMetricsChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.PositiveIntegerField()),
+                ('start_time', models.DateTimeField()),
+                ('sample_count', models.PositiveIntegerField()),
+                ('data', models.BinaryField()),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='metric_chunks', to='posture_app.posturesession')),
+            ],
+            options={
+                'ordering': ['session', 'index'],
+                'unique_together': {('session', 'index')},
+            },
+        ),
+    ]
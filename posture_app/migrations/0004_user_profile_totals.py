@@ -0,0 +1,81 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:38
+
+import datetime
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def fill_user_totals(apps, schema_editor):
+    """
+    Initialise les totaux des profils existants à partir des sessions terminées
+
+    Les alertes sont comptées à partir des lignes PostureAlert (comme
+    stats.recompute_user_totals), y compris le nombre d'alertes des jours.
+    """
+    UserProfile = apps.get_model('posture_app', 'UserProfile')
+    PostureSession = apps.get_model('posture_app', 'PostureSession')
+    PostureAlert = apps.get_model('posture_app', 'PostureAlert')
+    DailyStats = apps.get_model('posture_app', 'DailyStats')
+
+    totals = (
+        PostureSession.objects.filter(end_time__isnull=False)
+        .values('user_id')
+        .annotate(
+            sessions=Count('id'),
+            time=Sum('duration'),
+            score=Sum('posture_score'),
+        )
+    )
+    for row in totals:
+        UserProfile.objects.filter(user_id=row['user_id']).update(
+            total_sessions=row['sessions'],
+            total_time=row['time'] or datetime.timedelta(),
+            total_score=row['score'] or 0.0,
+        )
+
+    alerts = PostureAlert.objects.filter(session__end_time__isnull=False)
+    for row in alerts.values('session__user_id').annotate(count=Count('id')):
+        UserProfile.objects.filter(user_id=row['session__user_id']).update(total_alerts=row['count'])
+
+    DailyStats.objects.update(alert_count=0)
+    rows = (
+        alerts.annotate(day=TruncDate('session__start_time'))
+        .values('session__user_id', 'day')
+        .annotate(count=Count('id'))
+    )
+    for row in rows:
+        DailyStats.objects.filter(user_id=row['session__user_id'], date=row['day']).update(
+            alert_count=row['count']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posture_app', '0003_session_metrics_chunk'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='total_alerts',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='total_score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='total_sessions',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='total_time',
+            field=models.DurationField(default=datetime.timedelta),
+        ),
+        migrations.RunPython(fill_user_totals, migrations.RunPython.noop),
+    ]
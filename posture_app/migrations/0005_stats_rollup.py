@@ -0,0 +1,91 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:39
+
+import datetime
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+
+
+def fill_rollups(apps, schema_editor):
+    """Calcule les agrégats des sessions terminées existantes (comme stats.rebuild_rollups)"""
+    StatsRollup = apps.get_model('posture_app', 'StatsRollup')
+    PostureSession = apps.get_model('posture_app', 'PostureSession')
+    PostureAlert = apps.get_model('posture_app', 'PostureAlert')
+
+    def bucket_date(value):
+        return value if type(value) is datetime.date else timezone.localdate(value)
+
+    sessions = PostureSession.objects.filter(end_time__isnull=False)
+    alerts = PostureAlert.objects.filter(session__end_time__isnull=False)
+    truncations = {'day': TruncDate, 'week': TruncWeek, 'month': TruncMonth}
+
+    rollups = {}
+    for granularity, trunc in truncations.items():
+        rows = (
+            sessions.annotate(bucket=trunc('start_time'))
+            .values('user_id', 'bucket')
+            .annotate(
+                session_count=Count('id'),
+                total_time=Sum('duration'),
+                bad_posture_time=Sum('total_bad_posture_time'),
+                score_sum=Sum('posture_score'),
+                best_score=Max('posture_score'),
+                worst_score=Min('posture_score'),
+            )
+        )
+        for row in rows:
+            start = bucket_date(row.pop('bucket'))
+            row['total_time'] = row['total_time'] or datetime.timedelta()
+            row['bad_posture_time'] = row['bad_posture_time'] or datetime.timedelta()
+            rollups[(row['user_id'], granularity, start)] = StatsRollup(
+                granularity=granularity, start=start, **row
+            )
+
+        rows = (
+            alerts.annotate(bucket=trunc('session__start_time'))
+            .values('session__user_id', 'bucket', 'alert_type')
+            .annotate(count=Count('id'))
+        )
+        for row in rows:
+            key = (row['session__user_id'], granularity, bucket_date(row['bucket']))
+            setattr(rollups[key], f"{row['alert_type']}_alerts", row['count'])
+
+    StatsRollup.objects.bulk_create(rollups.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posture_app', '0004_user_profile_totals'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('day', 'Jour'), ('week', 'Semaine'), ('month', 'Mois')], max_length=5)),
+                ('start', models.DateField()),
+                ('session_count', models.IntegerField(default=0)),
+                ('total_time', models.DurationField(default=datetime.timedelta)),
+                ('bad_posture_time', models.DurationField(default=datetime.timedelta)),
+                ('score_sum', models.FloatField(default=0.0)),
+                ('best_score', models.FloatField(blank=True, null=True)),
+                ('worst_score', models.FloatField(blank=True, null=True)),
+                ('neck_alerts', models.IntegerField(default=0)),
+                ('back_alerts', models.IntegerField(default=0)),
+                ('shoulders_alerts', models.IntegerField(default=0)),
+                ('multiple_alerts', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['user', 'granularity', '-start'],
+                'unique_together': {('user', 'granularity', 'start')},
+            },
+        ),
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
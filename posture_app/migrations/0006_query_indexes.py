@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posture_app', '0005_stats_rollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='posturealert',
+            index=models.Index(fields=['session', 'alert_type'], name='alert_session_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='posturealert',
+            index=models.Index(fields=['session', 'timestamp'], name='alert_session_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='posturesession',
+            index=models.Index(fields=['user', 'start_time'], name='session_user_start_idx'),
+        ),
+    ]
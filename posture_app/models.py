@@ -15,10 +15,21 @@ class UserProfile(models.Model):
         default='default.jpg'
     )
     created_at = models.DateTimeField(auto_now_add=True)
+
+    # Totaux sur toutes les sessions terminées (mis à jour en fin de session)
+    total_sessions = models.IntegerField(default=0)
+    total_time = models.DurationField(default=timezone.timedelta)
+    total_score = models.FloatField(default=0.0)  # Somme des scores
+    total_alerts = models.IntegerField(default=0)
     
     def __str__(self):
         return f"Profil de {self.user.username}"
 
+    @property
+    def average_score(self):
+        """Score moyen des sessions terminées"""
+        return self.total_score / self.total_sessions if self.total_sessions else 0.0
+
 class PostureSession(models.Model):
     """Session d'analyse de posture"""
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -33,12 +44,17 @@ class PostureSession(models.Model):
     average_neck_angle = models.FloatField(null=True, blank=True)
     average_back_angle = models.FloatField(null=True, blank=True)
     average_shoulder_diff = models.FloatField(null=True, blank=True)
+    # Écart-type, min/max et percentiles (p50/p90/p99) de chaque métrique
+    metrics_summary = models.JSONField(default=dict, blank=True)
     
     # Score global
     posture_score = models.FloatField(default=0.0)
     
     class Meta:
         ordering = ['-start_time']
+        indexes = [
+            models.Index(fields=['user', 'start_time'], name='session_user_start_idx'),
+        ]
     
     def __str__(self):
         return f"Session {self.id} - {self.user.username} - {self.start_time.strftime('%d/%m/%Y %H:%M')}"
@@ -83,6 +99,10 @@ class PostureAlert(models.Model):
     
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['session', 'alert_type'], name='alert_session_type_idx'),
+            models.Index(fields=['session', 'timestamp'], name='alert_session_time_idx'),
+        ]
     
     def __str__(self):
         return f"Alerte {self.alert_type} - {self.timestamp.strftime('%H:%M:%S')}"
@@ -104,3 +124,49 @@ class DailyStats(models.Model):
     
     def __str__(self):
         return f"Stats {self.user.username} - {self.date.strftime('%d/%m/%Y')}"
+
+class SessionMetricsChunk(models.Model):
+    """Bloc de mesures par frame d'une session (tableau binaire compact)"""
+    session = models.ForeignKey(PostureSession, on_delete=models.CASCADE, related_name='metric_chunks')
+    index = models.PositiveIntegerField()
+    start_time = models.DateTimeField()  # Horodatage de la première mesure du bloc
+    sample_count = models.PositiveIntegerField()
+    data = models.BinaryField()  # Voir posture_app.timeline.SAMPLE_DTYPE
+
+    class Meta:
+        ordering = ['session', 'index']
+        unique_together = ['session', 'index']
+
+    def __str__(self):
+        return f"Mesures session {self.session_id} - bloc {self.index} ({self.sample_count})"
+
+class StatsRollup(models.Model):
+    """Statistiques agrégées d'un utilisateur par jour, semaine ou mois"""
+    GRANULARITIES = [
+        ('day', 'Jour'),
+        ('week', 'Semaine'),   # Commence le lundi
+        ('month', 'Mois'),     # Commence le 1er
+    ]
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    granularity = models.CharField(max_length=5, choices=GRANULARITIES)
+    start = models.DateField()
+
+    session_count = models.IntegerField(default=0)
+    total_time = models.DurationField(default=timezone.timedelta)
+    bad_posture_time = models.DurationField(default=timezone.timedelta)
+    score_sum = models.FloatField(default=0.0)
+    best_score = models.FloatField(null=True, blank=True)
+    worst_score = models.FloatField(null=True, blank=True)
+
+    # Alertes enregistrées, par type (voir PostureAlert.ALERT_TYPES)
+    neck_alerts = models.IntegerField(default=0)
+    back_alerts = models.IntegerField(default=0)
+    shoulders_alerts = models.IntegerField(default=0)
+    multiple_alerts = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['user', 'granularity', '-start']
+        unique_together = ['user', 'granularity', 'start']
+
+    def __str__(self):
+        return f"Stats {self.user.username} - {self.granularity} du {self.start.strftime('%d/%m/%Y')}"
@@ -0,0 +1,327 @@
+# posture_app/stats.py
+
+from django.utils import timezone
+from django.db import IntegrityError, transaction
+from django.db.models import Sum, Avg, Count, Max, Min, F, Q
+from django.db.models.functions import Coalesce, Greatest, Least, TruncDate, TruncMonth, TruncWeek
+from datetime import date, timedelta
+
+from .models import PostureAlert, PostureSession, DailyStats, StatsRollup, UserProfile
+
+# Colonne de StatsRollup comptant chaque type d'alerte
+ROLLUP_ALERT_FIELDS = {alert_type: f'{alert_type}_alerts' for alert_type, _ in PostureAlert.ALERT_TYPES}
+
+
+def session_alert_counts(session):
+    """
+    Alertes enregistrées d'une session, par type
+
+    Les lignes PostureAlert sont la seule source des totaux d'alertes
+    (jour, profil, agrégats) : comptées à la clôture de la session, puis
+    au fil de l'eau pour celles enregistrées après (add_late_alerts).
+    """
+    return dict(
+        PostureAlert.objects.filter(session=session)
+        .values_list('alert_type')
+        .annotate(count=Count('id'))
+    )
+
+
+def add_late_alerts(session, alerts):
+    """Ajoute aux totaux des alertes enregistrées après la clôture de leur session"""
+    if session.end_time is None or not alerts:
+        return
+    count = len(alerts)
+    DailyStats.objects.filter(
+        user_id=session.user_id, date=timezone.localdate(session.start_time)
+    ).update(alert_count=F('alert_count') + count)
+    UserProfile.objects.filter(user_id=session.user_id).update(total_alerts=F('total_alerts') + count)
+
+    by_type = {}
+    for alert in alerts:
+        field = ROLLUP_ALERT_FIELDS[alert.alert_type]
+        by_type[field] = by_type.get(field, 0) + 1
+    starts = rollup_starts(timezone.localdate(session.start_time))
+    query = Q()
+    for granularity, start in starts.items():
+        query |= Q(granularity=granularity, start=start)
+    StatsRollup.objects.filter(query, user_id=session.user_id).update(
+        **{field: F(field) + value for field, value in by_type.items()}
+    )
+
+
+def update_daily_stats(user, session, alert_counts=None):
+    """
+    Ajoute une session terminée aux statistiques de son jour
+
+    Mise à jour incrémentale en un seul UPDATE (expressions F) à partir des
+    valeurs de la session : le coût ne dépend pas du nombre de sessions
+    déjà enregistrées ce jour-là. À n'appeler qu'une fois par session.
+    """
+    date = timezone.localdate(session.start_time)
+    duration = session.duration or timedelta()
+    bad_time = session.total_bad_posture_time or timedelta()
+    if alert_counts is None:
+        alert_counts = session_alert_counts(session)
+    alert_count = sum(alert_counts.values())
+
+    def increment():
+        return DailyStats.objects.filter(user=user, date=date).update(
+            # Moyenne des scores pondérée par le nombre de sessions (les
+            # membres de droite lisent les valeurs avant mise à jour)
+            average_score=(F('average_score') * F('session_count') + session.posture_score)
+            / (F('session_count') + 1.0),
+            session_count=F('session_count') + 1,
+            total_time=F('total_time') + duration,
+            bad_posture_time=F('bad_posture_time') + bad_time,
+            alert_count=F('alert_count') + alert_count,
+        )
+
+    if increment():
+        return
+
+    try:
+        with transaction.atomic():
+            DailyStats.objects.create(
+                user=user,
+                date=date,
+                session_count=1,
+                total_time=duration,
+                bad_posture_time=bad_time,
+                alert_count=alert_count,
+                average_score=session.posture_score,
+            )
+    except IntegrityError:
+        # Ligne créée entre-temps par une autre requête
+        increment()
+
+
+def recompute_daily_stats(user, date):
+    """Recalcule entièrement les statistiques d'un jour (réparation)"""
+    day_sessions = PostureSession.objects.filter(
+        user=user,
+        start_time__date=date,
+        end_time__isnull=False
+    )
+    totals = day_sessions.aggregate(
+        total_time=Sum('duration'),
+        bad_posture_time=Sum('total_bad_posture_time'),
+        average_score=Avg('posture_score'),
+    )
+    session_count = day_sessions.count()
+
+    if not session_count:
+        DailyStats.objects.filter(user=user, date=date).delete()
+        return None
+
+    daily_stat, created = DailyStats.objects.update_or_create(
+        user=user,
+        date=date,
+        defaults={
+            'session_count': session_count,
+            'total_time': totals['total_time'] or timedelta(),
+            'bad_posture_time': totals['bad_posture_time'] or timedelta(),
+            'alert_count': PostureAlert.objects.filter(session__in=day_sessions).count(),
+            'average_score': totals['average_score'] or 0,
+        }
+    )
+    return daily_stat
+
+
+def update_user_totals(user, session, alert_counts=None):
+    """Ajoute une session terminée aux totaux du profil (un seul UPDATE)"""
+    if alert_counts is None:
+        alert_counts = session_alert_counts(session)
+    updated = UserProfile.objects.filter(user=user).update(
+        total_sessions=F('total_sessions') + 1,
+        total_time=F('total_time') + (session.duration or timedelta()),
+        total_score=F('total_score') + session.posture_score,
+        total_alerts=F('total_alerts') + sum(alert_counts.values()),
+    )
+    if not updated:
+        # Profil absent (compte créé hors inscription) : le créer à jour
+        recompute_user_totals(user)
+
+
+def recompute_user_totals(user):
+    """Recalcule entièrement les totaux du profil (réparation)"""
+    sessions = PostureSession.objects.filter(user=user, end_time__isnull=False)
+    totals = sessions.aggregate(
+        total_sessions=Count('id'),
+        total_time=Sum('duration'),
+        total_score=Sum('posture_score'),
+    )
+    profile, created = UserProfile.objects.update_or_create(
+        user=user,
+        defaults={
+            'total_sessions': totals['total_sessions'],
+            'total_time': totals['total_time'] or timedelta(),
+            'total_score': totals['total_score'] or 0.0,
+            'total_alerts': PostureAlert.objects.filter(session__in=sessions).count(),
+        }
+    )
+    return profile
+
+
+# ==================== AGRÉGATS JOUR / SEMAINE / MOIS ====================
+
+def rollup_starts(day):
+    """Début du jour, de la semaine (lundi) et du mois contenant `day`"""
+    return {
+        'day': day,
+        'week': day - timedelta(days=day.weekday()),
+        'month': day.replace(day=1),
+    }
+
+
+def update_rollups(user, session, alert_counts=None):
+    """Ajoute une session terminée à ses agrégats jour, semaine et mois"""
+    score = session.posture_score
+    values = {
+        'session_count': 1,
+        'total_time': session.duration or timedelta(),
+        'bad_posture_time': session.total_bad_posture_time or timedelta(),
+        'score_sum': score,
+    }
+    if alert_counts is None:
+        alert_counts = session_alert_counts(session)
+    for alert_type, count in alert_counts.items():
+        values[ROLLUP_ALERT_FIELDS[alert_type]] = count
+
+    for granularity, start in rollup_starts(timezone.localdate(session.start_time)).items():
+        rollups = StatsRollup.objects.filter(user=user, granularity=granularity, start=start)
+
+        def increment():
+            return rollups.update(
+                best_score=Greatest(Coalesce(F('best_score'), score), score),
+                worst_score=Least(Coalesce(F('worst_score'), score), score),
+                **{field: F(field) + value for field, value in values.items()}
+            )
+
+        if increment():
+            continue
+        try:
+            with transaction.atomic():
+                StatsRollup.objects.create(
+                    user=user, granularity=granularity, start=start,
+                    best_score=score, worst_score=score, **values
+                )
+        except IntegrityError:
+            increment()
+
+
+def _cover_period(start, end):
+    """
+    Découpe [start, end] en mois, semaines et jours complets
+
+    Returns:
+        dict granularité -> liste des débuts d'agrégats à lire
+    """
+    cover = {'day': [], 'week': [], 'month': []}
+    cursor = start
+    while cursor <= end:
+        next_month = (cursor.replace(day=28) + timedelta(days=4)).replace(day=1)
+        if cursor.day == 1 and next_month - timedelta(days=1) <= end:
+            cover['month'].append(cursor)
+            cursor = next_month
+        elif cursor.weekday() == 0 and cursor + timedelta(days=6) <= end:
+            cover['week'].append(cursor)
+            cursor += timedelta(days=7)
+        else:
+            cover['day'].append(cursor)
+            cursor += timedelta(days=1)
+    return cover
+
+
+def period_stats(user, start, end=None):
+    """
+    Statistiques d'un utilisateur du jour `start` au jour `end` inclus
+
+    Combine le plus petit nombre d'agrégats (mois, semaines, puis jours)
+    couvrant exactement la période : une seule requête, quelques lignes.
+    """
+    end = end or timezone.localdate()
+    query = Q()
+    for granularity, starts in _cover_period(start, end).items():
+        if starts:
+            query |= Q(granularity=granularity, start__in=starts)
+
+    totals = StatsRollup.objects.filter(query, user=user).aggregate(
+        session_count=Sum('session_count'),
+        total_time=Sum('total_time'),
+        bad_posture_time=Sum('bad_posture_time'),
+        score_sum=Sum('score_sum'),
+        best_score=Max('best_score'),
+        worst_score=Min('worst_score'),
+        **{field: Sum(field) for field in ROLLUP_ALERT_FIELDS.values()}
+    ) if query else {}
+
+    session_count = totals.get('session_count') or 0
+    alert_distribution = [
+        {'alert_type': alert_type, 'count': totals[field]}
+        for alert_type, field in ROLLUP_ALERT_FIELDS.items()
+        if totals.get(field)
+    ]
+    return {
+        'total_sessions': session_count,
+        'total_time': totals.get('total_time') or timedelta(),
+        'bad_posture_time': totals.get('bad_posture_time') or timedelta(),
+        'avg_score': totals['score_sum'] / session_count if session_count else 0,
+        'best_score': totals.get('best_score') or 0,
+        'worst_score': totals.get('worst_score') or 0,
+        'total_alerts': sum(item['count'] for item in alert_distribution),
+        'alert_distribution': alert_distribution,
+    }
+
+
+def rebuild_rollups(user_ids):
+    """
+    Recalcule tous les agrégats d'un groupe d'utilisateurs (réparation, reprise)
+
+    Requêtes ensemblistes : un GROUP BY par granularité pour les sessions et
+    un pour les alertes, puis insertion en masse.
+    """
+    sessions = PostureSession.objects.filter(user_id__in=user_ids, end_time__isnull=False)
+    alerts = PostureAlert.objects.filter(session__in=sessions)
+    truncations = {'day': TruncDate, 'week': TruncWeek, 'month': TruncMonth}
+
+    rollups = {}
+    for granularity, trunc in truncations.items():
+        rows = (
+            sessions.annotate(bucket=trunc('start_time'))
+            .values('user_id', 'bucket')
+            .annotate(
+                session_count=Count('id'),
+                total_time=Sum('duration'),
+                bad_posture_time=Sum('total_bad_posture_time'),
+                score_sum=Sum('posture_score'),
+                best_score=Max('posture_score'),
+                worst_score=Min('posture_score'),
+            )
+        )
+        for row in rows:
+            start = _bucket_date(row.pop('bucket'))
+            rollups[(row['user_id'], granularity, start)] = StatsRollup(
+                granularity=granularity,
+                start=start,
+                **row
+            )
+
+        rows = (
+            alerts.annotate(bucket=trunc('session__start_time'))
+            .values('session__user_id', 'bucket', 'alert_type')
+            .annotate(count=Count('id'))
+        )
+        for row in rows:
+            key = (row['session__user_id'], granularity, _bucket_date(row['bucket']))
+            setattr(rollups[key], ROLLUP_ALERT_FIELDS[row['alert_type']], row['count'])
+
+    with transaction.atomic():
+        StatsRollup.objects.filter(user_id__in=user_ids).delete()
+        StatsRollup.objects.bulk_create(rollups.values(), batch_size=500)
+    return len(rollups)
+
+
+def _bucket_date(value):
+    # TruncWeek / TruncMonth renvoient un datetime pour un champ DateTimeField
+    return value if type(value) is date else timezone.localdate(value)
@@ -0,0 +1,184 @@
+# posture_app/streaming.py
+
+"""
+Canal WebSocket d'analyse en continu (ASGI).
+
+Le navigateur ouvre ``/ws/session/<session_id>/`` puis envoie chaque frame
+en message binaire (JPEG/WebP). Le serveur répond par un message JSON par
+frame analysée. Si l'inférence prend du retard, seules les frames les plus
+récentes sont conservées : les frames intermédiaires sont abandonnées pour
+que la latence reste bornée au lieu d'empiler les requêtes. L'analyse passe
+par le même pool borné que les vues async (frame_executor), avec la même
+cadence maximale et la même échéance (frame_admission).
+"""
+
+import asyncio
+import json
+import re
+import time
+from http.cookies import SimpleCookie
+from importlib import import_module
+from urllib.parse import urlparse
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .analyzer.config import PostureConfig
+from .frame_admission import FrameRateLimited, admit_frames, frame_deadline
+from .frame_executor import ExecutorSaturated, get_frame_executor
+
+SESSION_PATH = re.compile(r'^/ws/session/(?P<session_id>\d+)/$')
+
+
+class _LatestFrame:
+    """Emplacement unique contenant la dernière frame reçue"""
+
+    def __init__(self):
+        self.data = None
+        self.received = None
+        self.sequence = 0
+        self.dropped = 0
+        self.event = asyncio.Event()
+
+    def put(self, data):
+        if self.data is not None:
+            self.dropped += 1
+        self.data = data
+        self.received = time.time()
+        self.sequence += 1
+        self.event.set()
+
+    async def take(self):
+        await self.event.wait()
+        self.event.clear()
+        data, self.data = self.data, None
+        return data, self.sequence, self.received
+
+
+class _CookieRequest:
+    """Requête minimale permettant d'utiliser django.contrib.auth.get_user"""
+
+    def __init__(self, session):
+        self.session = session
+
+
+def _headers(scope):
+    return {name.decode('latin1'): value.decode('latin1') for name, value in scope.get('headers', [])}
+
+
+def _same_origin(headers):
+    """Refuse les connexions initiées par un autre site (cookies de session)"""
+    origin = headers.get('origin')
+    if not origin:
+        return True
+    return urlparse(origin).netloc == headers.get('host')
+
+
+def _authenticate(headers, session_id):
+    """
+    Retrouve l'utilisateur depuis le cookie de session et vérifie que la
+    session d'analyse lui appartient. Retourne (identifiant utilisateur,
+    mode de réponse de la session), ou None si la connexion doit être refusée.
+    """
+    from django.contrib.auth import get_user
+    from .models import PostureSession
+    from .views import _output_session_key
+
+    cookies = SimpleCookie()
+    cookies.load(headers.get('cookie', ''))
+    morsel = cookies.get(settings.SESSION_COOKIE_NAME)
+    if morsel is None:
+        return None
+
+    store = import_module(settings.SESSION_ENGINE).SessionStore(morsel.value)
+    user = get_user(_CookieRequest(store))
+    if not user.is_authenticated:
+        return None
+
+    exists = PostureSession.objects.filter(
+        id=session_id, user=user, end_time__isnull=True
+    ).exists()
+    if not exists:
+        return None
+
+    return user.pk, store.get(_output_session_key(session_id), PostureConfig.FRAME_OUTPUT_DEFAULT)
+
+
+async def websocket_application(scope, receive, send):
+    """Application ASGI des connexions WebSocket"""
+    match = SESSION_PATH.match(scope.get('path', ''))
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+
+    headers = _headers(scope)
+    auth = None
+    if match and _same_origin(headers):
+        session_id = int(match.group('session_id'))
+        auth = await sync_to_async(_authenticate)(headers, session_id)
+
+    if auth is None:
+        await send({'type': 'websocket.close', 'code': 4403})
+        return
+
+    user_id, output = auth
+
+    await send({'type': 'websocket.accept'})
+
+    latest = _LatestFrame()
+    closed = asyncio.Event()
+
+    async def reader():
+        nonlocal output
+        while True:
+            message = await receive()
+            if message['type'] == 'websocket.disconnect':
+                break
+            if message.get('bytes'):
+                latest.put(message['bytes'])
+            elif message.get('text'):
+                # Message de contrôle : changement du mode de réponse
+                try:
+                    control = json.loads(message['text'])
+                except ValueError:
+                    continue
+                if isinstance(control, dict) and control.get('output') in PostureConfig.FRAME_OUTPUT_MODES:
+                    output = control['output']
+        closed.set()
+        latest.event.set()
+
+    async def worker():
+        from .views import _analyze_image
+
+        executor = get_frame_executor()
+        while not closed.is_set():
+            data, sequence, received = await latest.take()
+            if data is None:
+                continue
+            try:
+                # Messages binaires sans horodatage : l'échéance part de la réception
+                admit_frames(user_id, session_id)
+                result, live = await executor.run(
+                    _analyze_image, data, user_id, session_id, output, frame_deadline(received=received)
+                )
+                payload = {'success': True, 'result': result, 'session': live}
+            except (FrameRateLimited, ExecutorSaturated):
+                # Cadence dépassée ou pool plein : la frame est abandonnée, la suivante la remplace
+                latest.dropped += 1
+                continue
+            except Exception as e:
+                payload = {'success': False, 'error': str(e)}
+            payload['frame'] = sequence
+            payload['dropped'] = latest.dropped
+            if not closed.is_set():
+                await send({'type': 'websocket.send', 'text': json.dumps(payload)})
+
+    worker_task = asyncio.ensure_future(worker())
+    try:
+        await reader()
+    finally:
+        worker_task.cancel()
+        try:
+            await worker_task
+        except asyncio.CancelledError:
+            pass
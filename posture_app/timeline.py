@@ -0,0 +1,158 @@
+# posture_app/timeline.py
+
+"""
+Série temporelle des mesures par frame d'une session.
+
+Les mesures sont accumulées dans un tableau NumPy préalloué puis écrites
+par blocs de TIMELINE_CHUNK_SIZE mesures (un enregistrement
+SessionMetricsChunk par bloc, 17 octets par frame) au lieu d'une ligne
+par frame. La lecture regroupe les mesures en un nombre borné de points.
+"""
+
+import logging
+from datetime import datetime, timezone as dt_timezone
+
+import numpy as np
+from django.db import DatabaseError, IntegrityError, transaction
+from django.db.models import Max
+
+from .analyzer.config import PostureConfig
+from .models import SessionMetricsChunk
+
+logger = logging.getLogger(__name__)
+
+# Tentatives d'écriture d'un bloc quand son index est déjà pris
+_FLUSH_ATTEMPTS = 3
+
+# Une mesure : décalage (s) depuis le début du bloc, angles, posture correcte
+SAMPLE_DTYPE = np.dtype([
+    ('t', '<f4'),
+    ('neck', '<f4'),
+    ('back', '<f4'),
+    ('shoulder', '<f4'),
+    ('good', 'u1'),
+])
+
+
+class TimelineBuffer:
+    """Tampon des mesures d'une session, vidé en base bloc par bloc"""
+
+    def __init__(self, session_id, chunk_size=None):
+        self.session_id = session_id
+        self.samples = np.empty(chunk_size or PostureConfig.TIMELINE_CHUNK_SIZE, dtype=SAMPLE_DTYPE)
+        self.size = 0
+        self.origin = None
+        self.next_index = None
+
+    def append(self, timestamp, neck, back, shoulder, is_good):
+        """Ajoute une mesure (timestamp en secondes epoch)"""
+        if self.size == 0:
+            self.origin = timestamp
+        self.samples[self.size] = (timestamp - self.origin, neck, back, shoulder, is_good)
+        self.size += 1
+        if self.size == len(self.samples):
+            self.flush()
+
+    def flush(self):
+        """
+        Écrit les mesures en attente dans un nouveau bloc
+
+        Ne lève pas d'exception : en cas d'échec d'écriture, le bloc est
+        abandonné (erreur journalisée) et le tampon reste utilisable.
+        """
+        if not self.size:
+            return None
+        try:
+            return self._write()
+        except DatabaseError:
+            logger.exception(
+                "Bloc de mesures de la session %s abandonné (%d mesures)", self.session_id, self.size
+            )
+            self.next_index = None  # Relire l'index en base à la prochaine écriture
+            return None
+        finally:
+            self.size = 0
+
+    def _write(self):
+        for attempt in range(_FLUSH_ATTEMPTS):
+            if self.next_index is None:
+                # Reprise possible après un redémarrage ou une éviction
+                last = SessionMetricsChunk.objects.filter(
+                    session_id=self.session_id
+                ).aggregate(last=Max('index'))['last']
+                self.next_index = 0 if last is None else last + 1
+            try:
+                # Point de sauvegarde : un doublon n'invalide pas la transaction englobante
+                with transaction.atomic():
+                    chunk = SessionMetricsChunk.objects.create(
+                        session_id=self.session_id,
+                        index=self.next_index,
+                        start_time=datetime.fromtimestamp(self.origin, tz=dt_timezone.utc),
+                        sample_count=self.size,
+                        data=self.samples[:self.size].tobytes(),
+                    )
+            except IntegrityError:
+                # Index pris par un autre processus pour la même session
+                if attempt == _FLUSH_ATTEMPTS - 1:
+                    raise
+                self.next_index = None
+                continue
+            self.next_index += 1
+            return chunk
+
+
+def load_session_series(session):
+    """
+    Mesures d'une session en un seul tableau
+
+    Returns:
+        (t, samples) : décalages en secondes depuis le début de la session
+        (float64) et tableau structuré SAMPLE_DTYPE
+    """
+    chunks = list(
+        SessionMetricsChunk.objects.filter(session=session)
+        .order_by('index')
+        .values_list('start_time', 'data')
+    )
+    if not chunks:
+        return np.empty(0), np.empty(0, dtype=SAMPLE_DTYPE)
+
+    offsets, parts = [], []
+    for start_time, data in chunks:
+        part = np.frombuffer(bytes(data), dtype=SAMPLE_DTYPE)
+        offsets.append((start_time - session.start_time).total_seconds() + part['t'].astype(np.float64))
+        parts.append(part)
+    t, samples = np.concatenate(offsets), np.concatenate(parts)
+
+    # Les lots de frames horodatées peuvent arriver dans le désordre
+    if np.any(np.diff(t) < 0):
+        order = np.argsort(t, kind='stable')
+        t, samples = t[order], samples[order]
+    return t, samples
+
+
+def downsample(t, samples, max_points):
+    """
+    Regroupe les mesures en au plus `max_points` intervalles de temps égaux
+
+    Chaque point contient le temps moyen, les angles moyens et la part de
+    frames en bonne posture de l'intervalle ; les intervalles vides sont omis.
+    """
+    if len(t) <= max_points:
+        starts = np.arange(len(t))
+    else:
+        edges = np.linspace(t[0], t[-1], max_points + 1)[:-1]
+        starts = np.unique(np.searchsorted(t, edges, side='left'))
+
+    counts = np.diff(np.append(starts, len(t)))
+
+    def mean(values):
+        return np.add.reduceat(values.astype(np.float64), starts) / counts
+
+    return {
+        't': np.round(mean(t), 2).tolist(),
+        'neck_angle': np.round(mean(samples['neck']), 1).tolist(),
+        'back_angle': np.round(mean(samples['back']), 1).tolist(),
+        'shoulder_diff': np.round(mean(samples['shoulder']), 1).tolist(),
+        'good_ratio': np.round(mean(samples['good']), 3).tolist(),
+    }
@@ -22,9 +22,16 @@ urlpatterns = [
     # Guide de posture
     path('guide/', views.posture_guide, name='posture_guide'),
 
+    # Métriques Prometheus
+    path('metrics', views.metrics_view, name='metrics'),
+
     # API Endpoints pour l'analyse en temps réel
     path('api/session/start/', views.start_session_api, name='start_session_api'),
     path('api/session/<int:session_id>/end/', views.end_session_api, name='end_session_api'),
+    path('api/session/<int:session_id>/timeline/', views.session_timeline_api, name='session_timeline_api'),
     path('api/alert/save/', views.save_alert_api, name='save_alert_api'),
+    path('api/alert/bulk/', views.save_alerts_bulk_api, name='save_alerts_bulk_api'),
     path('api/frame/process/', views.process_frame_api, name='process_frame_api'),
+    path('api/frame/upload/', views.upload_frame_api, name='upload_frame_api'),
+    path('api/frame/batch/', views.process_frames_batch_api, name='process_frames_batch_api'),
 ]
@@ -1,22 +1,34 @@
 # posture_app/views.py
 
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 from django.contrib import messages
-from django.http import JsonResponse
+from django.core.exceptions import RequestDataTooBig
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
-from django.db.models import Sum, Avg, Count, Max, Min
-from datetime import timedelta, datetime
+from django.db import transaction
+from datetime import timedelta, datetime, timezone as dt_timezone
 import json
-import cv2
+import math
+import time
 import base64
-import numpy as np
+
+from asgiref.sync import sync_to_async
 
 from .models import UserProfile, PostureSession, PostureAlert, DailyStats
+from .stats import (
+    add_late_alerts, period_stats, rebuild_rollups, recompute_daily_stats, recompute_user_totals,
+    session_alert_counts, update_daily_stats, update_rollups, update_user_totals
+)
 from .analyzer.config import PostureConfig
+from .analyzer.profiling import stage
+from .frame_admission import (
+    FrameRateLimited, admit_frames, expired_result, frame_deadline, frame_expired, release_session_limit
+)
+from .frame_executor import ExecutorSaturated, get_frame_executor
 
 
 # ==================== VUES D'AUTHENTIFICATION ====================
@@ -79,23 +91,12 @@ def dashboard(request):
     # Récupérer les sessions récentes
     recent_sessions = PostureSession.objects.filter(user=user)[:10]
 
-    # Statistiques globales
-    total_sessions = PostureSession.objects.filter(user=user).count()
-
-    # Temps total
-    total_time = PostureSession.objects.filter(user=user).aggregate(
-        total=Sum('duration')
-    )['total'] or timedelta()
-
-    # Score moyen
-    avg_score = PostureSession.objects.filter(user=user).aggregate(
-        avg=Avg('posture_score')
-    )['avg'] or 0
-
-    # Alertes totales
-    total_alerts = PostureAlert.objects.filter(
-        session__user=user
-    ).count()
+    # Statistiques globales (totaux tenus à jour sur le profil)
+    profile = UserProfile.objects.filter(user=user).first() or recompute_user_totals(user)
+    total_sessions = profile.total_sessions
+    total_time = profile.total_time
+    avg_score = profile.average_score
+    total_alerts = profile.total_alerts
 
     # Statistiques des 7 derniers jours
     seven_days_ago = timezone.now() - timedelta(days=7)
@@ -164,27 +165,16 @@ def statistics_view(request):
     period = request.GET.get('period', '30')  # 7, 30, 90 jours
     days_ago = timezone.now() - timedelta(days=int(period))
 
-    # Toutes les sessions de la période
+    # Statistiques détaillées, combinées à partir des agrégats jour/semaine/mois
+    stats = period_stats(user, timezone.localdate(days_ago))
+    alert_distribution = stats.pop('alert_distribution')
+
+    # Sessions de la période
     sessions = PostureSession.objects.filter(
         user=user,
         start_time__gte=days_ago
     )
 
-    # Statistiques détaillées
-    stats = {
-        'total_sessions': sessions.count(),
-        'total_time': sessions.aggregate(Sum('duration'))['duration__sum'] or timedelta(),
-        'avg_score': sessions.aggregate(Avg('posture_score'))['posture_score__avg'] or 0,
-        'best_score': sessions.aggregate(max_score=Max('posture_score'))['max_score'] or 0,
-        'worst_score': sessions.aggregate(min_score=Min('posture_score'))['min_score'] or 0,
-        'total_alerts': PostureAlert.objects.filter(session__in=sessions).count(),
-    }
-
-    # Distribution des alertes par type
-    alert_distribution = PostureAlert.objects.filter(
-        session__in=sessions
-    ).values('alert_type').annotate(count=Count('id'))
-
     context = {
         'stats': stats,
         'period': period,
@@ -209,13 +199,22 @@ def session_detail(request, session_id):
 
 
 # ==================== API ENDPOINTS ====================
+# Vues async : décodage et inférence passent par le pool borné
+# (frame_executor), la base par l'ORM async ou sync_to_async.
 
 @login_required
 @csrf_exempt
-def start_session_api(request):
+async def start_session_api(request):
     """API pour démarrer une nouvelle session"""
     if request.method == 'POST':
-        session = PostureSession.objects.create(user=request.user)
+        user = await request.auser()
+        session = await PostureSession.objects.acreate(user=user)
+
+        # Mode de réponse par défaut des frames de cette session
+        output = _read_json_body(request).get('output')
+        if output in PostureConfig.FRAME_OUTPUT_MODES:
+            await request.session.aset(_output_session_key(session.id), output)
+
         return JsonResponse({
             'success': True,
             'session_id': session.id,
@@ -226,59 +225,67 @@ def start_session_api(request):
 
 @login_required
 @csrf_exempt
-def end_session_api(request, session_id):
+async def end_session_api(request, session_id):
     """API pour terminer une session"""
     if request.method == 'POST':
+        user = await request.auser()
         try:
-            session = PostureSession.objects.get(id=session_id, user=request.user)
-            session.end_time = timezone.now()
+            session = await sync_to_async(_end_session)(user, session_id, _read_json_body(request))
+        except PostureSession.DoesNotExist:
+            return JsonResponse({'success': False, 'error': 'Session not found'}, status=404)
 
-            # Récupérer les données de la session depuis POST
-            data = json.loads(request.body)
-            session.total_bad_posture_time = timedelta(seconds=data.get('bad_posture_time', 0))
-            session.bad_posture_percentage = data.get('bad_posture_percentage', 0)
-            session.alert_count = data.get('alert_count', 0)
-            session.average_neck_angle = data.get('avg_neck_angle')
-            session.average_back_angle = data.get('avg_back_angle')
-            session.average_shoulder_diff = data.get('avg_shoulder_diff')
+        await request.session.apop(_output_session_key(session.id), None)
 
-            session.save()
+        return JsonResponse({
+            'success': True,
+            'session_id': session.id,
+            'duration': str(session.duration),
+            'score': session.posture_score
+        })
 
-            # Mettre à jour les statistiques quotidiennes
-            update_daily_stats(request.user, session)
+    return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
 
-            return JsonResponse({
-                'success': True,
-                'session_id': session.id,
-                'duration': str(session.duration),
-                'score': session.posture_score
-            })
-        except PostureSession.DoesNotExist:
-            return JsonResponse({'success': False, 'error': 'Session not found'}, status=404)
 
-    return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
+@login_required
+async def session_timeline_api(request, session_id):
+    """API pour récupérer l'évolution des mesures d'une session (nombre de points borné)"""
+    user = await request.auser()
+    session = await aget_object_or_404(PostureSession, id=session_id, user=user)
+
+    try:
+        max_points = int(request.GET.get('points', PostureConfig.TIMELINE_MAX_POINTS))
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Paramètre points invalide'}, status=400)
+    max_points = min(max(max_points, 1), PostureConfig.TIMELINE_POINTS_LIMIT)
+
+    from .timeline import downsample, load_session_series
+
+    t, samples = await sync_to_async(load_session_series)(session)
+    timeline = downsample(t, samples, max_points) if len(t) else None
+
+    return JsonResponse({
+        'success': True,
+        'session_id': session.id,
+        'sample_count': int(len(t)),
+        'timeline': timeline,
+    })
 
 
 @login_required
 @csrf_exempt
-def save_alert_api(request):
+async def save_alert_api(request):
     """API pour sauvegarder une alerte"""
     if request.method == 'POST':
         try:
             data = json.loads(request.body)
-            session = PostureSession.objects.get(
+            user = await request.auser()
+            session = await PostureSession.objects.aget(
                 id=data.get('session_id'),
-                user=request.user
+                user=user
             )
 
-            alert = PostureAlert.objects.create(
-                session=session,
-                alert_type=data.get('alert_type', 'multiple'),
-                neck_angle=data.get('neck_angle', 0),
-                back_angle=data.get('back_angle', 0),
-                shoulder_diff=data.get('shoulder_diff', 0),
-                duration=timedelta(seconds=data.get('duration', 0))
-            )
+            alert = PostureAlert(session=session, **_parse_alert(data))
+            await sync_to_async(_create_alerts)(session, [alert])
 
             return JsonResponse({
                 'success': True,
@@ -292,28 +299,174 @@ def save_alert_api(request):
 
 @login_required
 @csrf_exempt
-def process_frame_api(request):
-    """API pour traiter une frame vidéo"""
+async def save_alerts_bulk_api(request):
+    """API pour sauvegarder un lot d'alertes d'une session (une seule transaction)"""
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
+
+    data = _read_json_body(request)
+    items = data.get('alerts')
+    if not isinstance(items, list) or not items:
+        return JsonResponse({'success': False, 'error': 'Aucune alerte'}, status=400)
+    if len(items) > PostureConfig.ALERT_BATCH_MAX:
+        return JsonResponse({
+            'success': False,
+            'error': f'Maximum {PostureConfig.ALERT_BATCH_MAX} alertes par lot'
+        }, status=400)
+
+    user = await request.auser()
+    session = await PostureSession.objects.filter(
+        id=_parse_session_id(data.get('session_id')),
+        user=user
+    ).afirst()
+    if session is None:
+        return JsonResponse({'success': False, 'error': 'Session not found'}, status=404)
+
+    # Valider chaque alerte : les alertes invalides sont signalées sans bloquer les autres
+    alerts, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            alerts.append(PostureAlert(session=session, **_parse_alert(item)))
+        except ValueError as e:
+            errors.append({'index': index, 'error': str(e)})
+
+    created = await sync_to_async(_create_alerts)(session, alerts)
+
+    return JsonResponse({
+        'success': True,
+        'created': len(created),
+        'alert_ids': [alert.id for alert in created],
+        'errors': errors,
+    })
+
+
+@login_required
+@csrf_exempt
+async def process_frame_api(request):
+    """API pour traiter une frame vidéo (`captured_at` : instant de capture en ms)"""
     if request.method == 'POST':
         try:
             data = json.loads(request.body)
 
-            # Décoder l'image base64
-            image_data = data.get('frame', '')
-            image_data = image_data.split(',')[1] if ',' in image_data else image_data
-            image_bytes = base64.b64decode(image_data)
-            nparr = np.frombuffer(image_bytes, np.uint8)
-            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            # Décodage base64 et image faits dans le pool d'analyse
+            return await _analyze_frame_response(
+                request, data.get('frame', ''), data.get('session_id'), data.get('output'),
+                data.get('captured_at')
+            )
+        except Exception as e:
+            return JsonResponse({
+                'success': False,
+                'error': str(e)
+            }, status=400)
 
-            # Analyser la posture
-            from .analyzer.posture_analyzer import analyze_frame
+    return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
 
-            result = analyze_frame(frame)
 
+@login_required
+@csrf_exempt
+async def upload_frame_api(request):
+    """
+    API pour traiter une frame envoyée en binaire
+
+    Le corps de la requête est directement l'image JPEG/WebP
+    (session_id en paramètre d'URL), ou un formulaire multipart avec
+    un champ fichier `frame` : pas de JSON ni de base64 à décoder.
+    L'instant de capture (`captured_at`, ms) suit le même chemin que session_id.
+    """
+    if request.method == 'POST':
+        try:
+            if request.content_type == 'multipart/form-data':
+                upload = request.FILES.get('frame')
+                if upload is None:
+                    return JsonResponse({'success': False, 'error': 'Champ frame manquant'}, status=400)
+                image_bytes = upload.read()
+                session_id = request.POST.get('session_id') or request.GET.get('session_id')
+                captured_at = request.POST.get('captured_at') or request.GET.get('captured_at')
+            else:
+                image_bytes = request.body
+                session_id = request.GET.get('session_id')
+                captured_at = request.GET.get('captured_at')
+
+            return await _analyze_frame_response(
+                request, image_bytes, session_id, request.GET.get('output'), captured_at
+            )
+        except Exception as e:
             return JsonResponse({
-                'success': True,
-                'result': result
-            })
+                'success': False,
+                'error': str(e)
+            }, status=400)
+
+    return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
+
+
+@login_required
+@csrf_exempt
+async def process_frames_batch_api(request):
+    """
+    API pour traiter un lot de frames horodatées
+
+    JSON : {"session_id", "output", "frames": [{"timestamp", "frame"}]}
+    (frames en data URL base64), ou multipart avec des champs fichier
+    `frame` et des champs `timestamp` répétés dans le même ordre.
+    """
+    if request.method == 'POST':
+        try:
+            if _content_length(request) > PostureConfig.FRAME_BATCH_MAX_BYTES:
+                return _batch_too_large_response()
+            if request.content_type == 'multipart/form-data':
+                uploads = request.FILES.getlist('frame')
+                if sum(upload.size for upload in uploads) > PostureConfig.FRAME_BATCH_MAX_BYTES:
+                    return _batch_too_large_response()
+                timestamps = request.POST.getlist('timestamp')
+                items = [
+                    {
+                        'timestamp': timestamps[i] if i < len(timestamps) else None,
+                        'bytes': upload.read(),
+                    }
+                    for i, upload in enumerate(uploads)
+                ]
+                session_id = request.POST.get('session_id')
+                output = request.POST.get('output')
+            else:
+                body = _read_batch_body(request)
+                if body is None:
+                    return _batch_too_large_response()
+                data = json.loads(body)
+                items = [
+                    {
+                        'timestamp': item.get('timestamp'),
+                        'bytes': item.get('frame', ''),
+                    }
+                    for item in data.get('frames', [])
+                ]
+                session_id = data.get('session_id')
+                output = data.get('output')
+
+            if not items:
+                return JsonResponse({'success': False, 'error': 'Aucune frame'}, status=400)
+            if len(items) > PostureConfig.FRAME_BATCH_MAX:
+                return JsonResponse({
+                    'success': False,
+                    'error': f'Maximum {PostureConfig.FRAME_BATCH_MAX} frames par lot'
+                }, status=400)
+
+            user = await request.auser()
+            session_id = _parse_session_id(session_id)
+            if not await _session_allowed(user, session_id):
+                return JsonResponse({'success': False, 'error': 'Session not found'}, status=404)
+            output = await _resolve_output(request, session_id, output)
+            try:
+                # Chaque frame du lot compte dans la cadence de la session
+                admit_frames(user.pk, session_id, len(items))
+                batch = await get_frame_executor().run(_analyze_batch, items, user.pk, session_id, output)
+            except FrameRateLimited as e:
+                return _retry_response(e, 429)
+            except ExecutorSaturated as e:
+                return _retry_response(e, 503)
+
+            return JsonResponse(batch)
+        except RequestDataTooBig:
+            return _batch_too_large_response()
         except Exception as e:
             return JsonResponse({
                 'success': False,
@@ -323,36 +476,312 @@ def process_frame_api(request):
     return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
 
 
-# ==================== FONCTIONS UTILITAIRES ====================
+def metrics_view(request):
+    """Métriques du processus au format Prometheus (collecte par le serveur de supervision)"""
+    # Enregistre les jauges des modules chargés à la demande
+    from .analyzer import posture_analyzer  # noqa: F401
+    from . import live_sessions  # noqa: F401
+    from .analyzer.telemetry import render
 
-def update_daily_stats(user, session):
-    """Met à jour les statistiques quotidiennes"""
-    today = timezone.now().date()
+    return HttpResponse(render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
-    daily_stat, created = DailyStats.objects.get_or_create(
-        user=user,
-        date=today
+
+# ==================== FONCTIONS UTILITAIRES ====================
+
+def _decode_base64_frame(image_data):
+    """Extrait les octets d'une image envoyée en data URL / base64"""
+    image_data = image_data.split(',')[1] if ',' in image_data else image_data
+    with stage('base64_decode'):
+        return base64.b64decode(image_data)
+
+
+def _decode_batch_item(data):
+    """Décode une frame d'un lot ; None si elle est illisible (erreur par frame)"""
+    try:
+        if isinstance(data, str):
+            data = _decode_base64_frame(data)
+        return _decode_frame(data)
+    except Exception:
+        return None
+
+
+def _decode_frame(image_bytes):
+    """Décode une image JPEG/WebP en frame RGB, réduite si la résolution du palier courant le permet"""
+    from .analyzer.frame_ingest import decode_frame
+    from .analyzer.load_control import current_quality
+
+    with stage('imdecode'):
+        return decode_frame(image_bytes, current_quality().resolution)
+
+
+async def _analyze_frame_response(request, frame, session_id, output=None, captured_at=None):
+    """Analyse une frame (octets ou data URL base64) dans le pool borné et construit la réponse JSON"""
+    deadline = frame_deadline(captured_at)
+    user = await request.auser()
+    session_id = _parse_session_id(session_id)
+    if not await _session_allowed(user, session_id):
+        return JsonResponse({'success': False, 'error': 'Session not found'}, status=404)
+    output = await _resolve_output(request, session_id, output)
+
+    try:
+        admit_frames(user.pk, session_id)
+        result, live = await get_frame_executor().run(
+            _analyze_image, frame, user.pk, session_id, output, deadline
+        )
+    except FrameRateLimited as e:
+        return _retry_response(e, 429)
+    except ExecutorSaturated as e:
+        return _retry_response(e, 503)
+
+    return JsonResponse({
+        'success': True,
+        'result': result,
+        'session': live,
+    })
+
+
+def _analyze_image(image_data, user_id, session_id, output, deadline=None):
+    """Décode et analyse une frame, puis alimente la session (exécuté hors de la boucle d'événements)"""
+    from .analyzer.posture_analyzer import analyze_frame
+    from .live_sessions import record_frame
+
+    # Frame restée trop longtemps en attente : ni décodage ni inférence
+    if frame_expired(deadline):
+        return expired_result(), None
+
+    if isinstance(image_data, str):
+        image_data = _decode_base64_frame(image_data)
+    frame = _decode_frame(image_data)
+
+    # Analyser la posture avec le détecteur de la session
+    result = analyze_frame(frame, session_id=session_id, output=output, rgb=True)
+
+    # Alimenter l'état de la session tenu par le serveur
+    return result, record_frame(user_id, session_id, result)
+
+
+def _analyze_batch(items, user_id, session_id, output):
+    """Décode et analyse un lot de frames horodatées (exécuté hors de la boucle d'événements)"""
+    from .analyzer.posture_analyzer import analyze_frames
+    from .live_sessions import record_frame
+
+    # Analyser dans l'ordre de capture si toutes les frames sont horodatées
+    timestamped = all(item['timestamp'] is not None for item in items)
+    if timestamped:
+        items.sort(key=lambda item: float(item['timestamp']))
+
+    batch = analyze_frames(
+        [_decode_batch_item(item['bytes']) for item in items],
+        session_id=session_id,
+        output=output,
+        timestamps=[float(item['timestamp']) for item in items] if timestamped else None,
+        rgb=True
     )
+    # Alimenter la session en cours en respectant l'écart entre les frames
+    # (horodatages en secondes, la dernière frame étant la plus récente)
+    now = time.time()
+    latest = max((float(item['timestamp']) for item in items if item['timestamp'] is not None), default=None)
+    live = None
+    for item, result in zip(items, batch['results']):
+        result['timestamp'] = item['timestamp']
+        current_time = None
+        if latest is not None and item['timestamp'] is not None:
+            current_time = now - (latest - float(item['timestamp']))
+        live = record_frame(user_id, session_id, result, current_time) or live
+    batch['session'] = live
+    return batch
+
+
+def _content_length(request):
+    """Taille annoncée du corps de la requête (0 si absente ou invalide)"""
+    try:
+        return int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        return 0
+
+
+def _read_batch_body(request):
+    """
+    Corps d'un lot de frames, borné par FRAME_BATCH_MAX_BYTES (None au-delà)
+
+    Lu directement dans le flux : request.body appliquerait la limite
+    DATA_UPLOAD_MAX_MEMORY_SIZE du site, trop basse pour un lot complet.
+    """
+    body = request.read(PostureConfig.FRAME_BATCH_MAX_BYTES + 1)
+    return body if len(body) <= PostureConfig.FRAME_BATCH_MAX_BYTES else None
+
+
+def _batch_too_large_response():
+    """Réponse 413 d'un lot de frames dépassant FRAME_BATCH_MAX_BYTES"""
+    return JsonResponse({
+        'success': False,
+        'error': (
+            f'Lot trop volumineux (maximum {PostureConfig.FRAME_BATCH_MAX_BYTES // (1024 * 1024)} Mo) : '
+            'envoyer moins de frames par lot'
+        ),
+    }, status=413)
+
+
+async def _session_allowed(user, session_id):
+    """
+    Frames sans session, ou d'une session en cours de l'utilisateur
+
+    L'état d'analyse (détecteur, ROI, filtre temporel, série de mesures)
+    est indexé par session : un identifiant d'une autre session ne doit
+    jamais l'atteindre.
+    """
+    if session_id is None:
+        return True
+    from .live_sessions import owns_session
+    return await sync_to_async(owns_session)(user.pk, session_id)
+
+
+def _retry_response(error, status):
+    """Réponse 429 (cadence dépassée) ou 503 (file pleine) : le client réessaie après Retry-After"""
+    response = JsonResponse({
+        'success': False,
+        'error': str(error),
+        'retry_after': error.retry_after,
+    }, status=status)
+    response['Retry-After'] = str(error.retry_after)
+    return response
+
+
+def _end_session(user, session_id, data):
+    """Clôt une session et met à jour les statistiques (DoesNotExist si elle n'existe pas)"""
+    session = PostureSession.objects.get(id=session_id, user=user)
+    already_ended = session.end_time is not None
+    session.end_time = timezone.now()
+
+    from .live_sessions import forget_session, pop_live_session
+    forget_session(user.pk, session.id)
+    live = pop_live_session(user.pk, session.id)
+
+    if live is not None:
+        live.flush_timeline()
+    if live is not None and not (live.resumed and _posted_session_stats(data)):
+        # Finaliser à partir de l'état tenu par le serveur (partiel pour une
+        # session évincée puis reprise, si le client n'envoie rien)
+        analyzer = live.analyzer
+        analyzer.flush()
+        stats = analyzer.get_statistics((session.end_time - session.start_time).total_seconds())
+        session.total_bad_posture_time = timedelta(seconds=stats['bad_posture_time'])
+        session.bad_posture_percentage = stats['bad_posture_percentage']
+        session.alert_count = stats['alert_count']
+        if analyzer.neck_stats.count:
+            session.average_neck_angle = stats['avg_neck_angle']
+            session.average_back_angle = stats['avg_back_angle']
+            session.average_shoulder_diff = stats['avg_shoulder_diff']
+            session.metrics_summary = stats['metrics_summary']
+    else:
+        # Aucun état serveur (autre processus, session évincée) ou état
+        # partiel d'une session reprise : récupérer les données depuis POST
+        session.total_bad_posture_time = timedelta(seconds=data.get('bad_posture_time', 0))
+        session.bad_posture_percentage = data.get('bad_posture_percentage', 0)
+        session.alert_count = data.get('alert_count', 0)
+        session.average_neck_angle = data.get('avg_neck_angle')
+        session.average_back_angle = data.get('avg_back_angle')
+        session.average_shoulder_diff = data.get('avg_shoulder_diff')
+
+    session.save()
+
+    # Mettre à jour les statistiques quotidiennes et les totaux du profil
+    # (recalcul complet si la
+    # session avait déjà été comptée)
+    if already_ended:
+        recompute_daily_stats(user, timezone.localdate(session.start_time))
+        recompute_user_totals(user)
+        rebuild_rollups([user.pk])
+    else:
+        alert_counts = session_alert_counts(session)
+        update_daily_stats(user, session, alert_counts)
+        update_user_totals(user, session, alert_counts)
+        update_rollups(user, session, alert_counts)
 
-    # Récupérer toutes les sessions du jour
-    today_sessions = PostureSession.objects.filter(
-        user=user,
-        start_time__date=today
+    # Libérer le détecteur et l'état d'analyse réservés à la session
+    from .analyzer.posture_analyzer import release_session
+    release_session(session.id)
+    release_session_limit(user.pk, session.id)
+    return session
+
+
+def _posted_session_stats(data):
+    """Le client a envoyé ses statistiques de session"""
+    return any(key in data for key in ('bad_posture_time', 'bad_posture_percentage', 'alert_count'))
+
+
+def _create_alerts(session, alerts):
+    """Insère un lot d'alertes validées en une seule transaction (totaux compris si la session est close)"""
+    with transaction.atomic():
+        created = PostureAlert.objects.bulk_create(alerts)
+        add_late_alerts(session, created)
+    return created
+
+
+async def _resolve_output(request, session_id, output):
+    """Mode demandé par la requête, sinon celui choisi au démarrage de la session"""
+    if output in PostureConfig.FRAME_OUTPUT_MODES:
+        return output
+    return await request.session.aget(
+        _output_session_key(session_id), PostureConfig.FRAME_OUTPUT_DEFAULT
     )
 
-    # Calculer les stats
-    daily_stat.session_count = today_sessions.count()
-    daily_stat.total_time = today_sessions.aggregate(
-        total=Sum('duration')
-    )['total'] or timedelta()
-    daily_stat.bad_posture_time = today_sessions.aggregate(
-        total=Sum('total_bad_posture_time')
-    )['total'] or timedelta()
-    daily_stat.alert_count = PostureAlert.objects.filter(
-        session__in=today_sessions
-    ).count()
-    daily_stat.average_score = today_sessions.aggregate(
-        avg=Avg('posture_score')
-    )['avg'] or 0
-
-    daily_stat.save()
\ No newline at end of file
+
+def _output_session_key(session_id):
+    """Clé de session Django mémorisant le mode de réponse d'une PostureSession"""
+    return f'frame_output_{session_id}'
+
+
+def _parse_alert(item):
+    """Valide une alerte envoyée par le client (ValueError si invalide)"""
+    if not isinstance(item, dict):
+        raise ValueError('Alerte invalide')
+
+    alert_type = item.get('alert_type', 'multiple')
+    if alert_type not in dict(PostureAlert.ALERT_TYPES):
+        raise ValueError(f'Type d\'alerte inconnu: {alert_type}')
+
+    fields = {'alert_type': alert_type}
+    try:
+        for name in ('neck_angle', 'back_angle', 'shoulder_diff'):
+            fields[name] = _finite(item.get(name, 0))
+        duration = _finite(item.get('duration', 0))
+        timestamp = item.get('timestamp')
+        if timestamp is not None:
+            # Horodatage client en secondes (epoch)
+            fields['timestamp'] = datetime.fromtimestamp(_finite(timestamp), tz=dt_timezone.utc)
+    except (TypeError, ValueError, OverflowError, OSError):
+        raise ValueError('Valeur numérique invalide')
+
+    if duration < 0:
+        raise ValueError('Durée négative')
+    try:
+        fields['duration'] = timedelta(seconds=duration)
+    except OverflowError:
+        raise ValueError('Durée invalide')
+    return fields
+
+
+def _finite(value):
+    """Nombre fini envoyé par le client (ValueError pour nan, inf ou non numérique)"""
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(value)
+    return number
+
+
+def _read_json_body(request):
+    """Lit un corps JSON optionnel (dict vide si absent ou invalide)"""
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _parse_session_id(value):
+    """Convertit l'identifiant de session reçu du client (None si absent)"""
+    try:
+        return int(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None